@@ -0,0 +1,67 @@
+"""
+Gunicorn settings, read from the working directory: `gunicorn` alone
+starts the app. Environment variables tune them per deployment, and
+command line options still override everything.
+
+Migrations and collectstatic are not run here, see `make release`.
+"""
+import gc
+import multiprocessing
+from os import getenv, path
+
+ASYNC_WORKER_CLASSES = ("uvicorn.workers.UvicornWorker",)
+
+bind = f"0.0.0.0:{getenv('PORT', '8000')}"
+
+# gthread by default: the threads of a worker share its memory and
+# wait on the database in parallel. The uvicorn worker serves the
+# ASGI application instead.
+worker_class = getenv("GUNICORN_WORKER_CLASS", "gthread")
+is_async = worker_class in ASYNC_WORKER_CLASSES
+wsgi_app = "task_manager.asgi" if is_async else "task_manager.wsgi"
+
+# An event loop keeps one core busy. A sync worker also waits on I/O:
+# the usual 2 x cores + 1. A gthread worker's threads already overlap
+# that wait, so one worker per core (+ 1) is enough.
+cpus = multiprocessing.cpu_count()
+if is_async:
+    default_workers = cpus
+elif worker_class == "sync":
+    default_workers = cpus * 2 + 1
+else:
+    default_workers = cpus + 1
+workers = int(getenv("WEB_CONCURRENCY", default_workers))
+# Each thread holds its own database connection (CONN_MAX_AGE), so the
+# app keeps up to workers x threads of them open: 36 on 8 cores with the
+# defaults. Keep that below the database's max_connections.
+threads = int(getenv("GUNICORN_THREADS", 4))
+
+# Import Django once in the master: workers share its memory pages
+# copy-on-write and (re)start without importing anything.
+preload_app = bool(int(getenv("GUNICORN_PRELOAD", 1)))
+
+# Recycle workers to bound slow leaks; the jitter keeps them from all
+# restarting at once.
+max_requests = int(getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+# Longer than the idle timeout of the proxy in front, so it is the
+# proxy that closes idle connections.
+keepalive = int(getenv("GUNICORN_KEEPALIVE", 75))
+timeout = int(getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = timeout
+
+# The heartbeat file is touched constantly, keep it off the disk.
+if path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+
+def when_ready(server):
+    """
+    Moves everything the preloaded app allocated out of the garbage
+    collector's reach, so collections in the workers don't write to
+    (and un-share) those pages.
+    """
+    if preload_app:
+        gc.collect()
+        gc.freeze()
@@ -0,0 +1,25 @@
+"""
+Helpers for the JSON API views: compact responses with strong ETags.
+
+The views compute the ETag from data they already have at hand (the
+cached status catalogue, the page of users) and answer a matching
+If-None-Match with 304 before anything is serialized.
+"""
+from django.http import JsonResponse
+
+from task_manager.conditional import not_modified, set_validators
+
+
+def conditional_json(request, etag, get_data, private=False):
+    """
+    Returns 304 if the client's copy matches `etag`, otherwise the JSON
+    of `get_data()`. Clients are asked to revalidate on every use.
+    """
+    response = not_modified(request, etag)
+
+    if response is None:
+        response = JsonResponse(
+            get_data(), json_dumps_params={"separators": (",", ":")}
+        )
+
+    return set_validators(response, etag, private=private)
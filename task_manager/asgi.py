@@ -3,6 +3,12 @@ ASGI config for task_manager project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Run it with uvicorn workers under gunicorn: `make start-asgi`, which
+reads the worker settings from gunicorn.conf.py.
+
+The list views are served by their async variants there, so a worker
+isn't blocked by slow clients while it waits on the network.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 """
@@ -11,6 +17,10 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from task_manager import warmup
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+os.environ.setdefault('ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
+warmup.run()
@@ -0,0 +1,401 @@
+"""
+Fixtures and scenarios of `manage.py bench`.
+
+Every named route of the URLconf (admin aside) has at least one
+scenario: the raw HTTP requests to send and the status code a healthy
+response has. Requests that consume their target (deletes, logouts,
+password changes) each get one of their own, created beforehand by the
+fixture generator, so all requests of a scenario do the same work.
+"""
+from itertools import count
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.middleware.csrf import CSRF_ALLOWED_CHARS
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils.crypto import get_random_string
+
+from task_manager.loadgen import build_request
+from task_manager.status.cache import invalidate
+from task_manager.status.models import Status
+from task_manager.task.models import Task
+
+PASSWORD = "Pukote74."
+BATCH_SIZE = 10000
+EXCLUDED_NAMESPACES = ("admin",)
+
+
+class Fixtures:
+    """Seeds the database and builds authenticated raw requests."""
+
+    def __init__(self, host):
+        self.host = host
+        self.password = make_password(PASSWORD)
+        self.csrf_token = get_random_string(32, CSRF_ALLOWED_CHARS)
+        self.batches = count()
+
+    def seed(self, users, statuses, tasks=0):
+        self.users = self.create_users(users)
+        self.statuses = self.create_statuses(statuses)
+        self.create_tasks(tasks)
+        self.user = self.users[0]
+        self.session = self.login(self.user)
+        self.staff_session = self.login(self.create_users(1, is_staff=True)[0])
+
+    def create_users(self, number, **fields):
+        prefix = f"bench-{next(self.batches)}-"
+        User.objects.bulk_create(
+            User(
+                username=f"{prefix}{i}",
+                first_name="Bench",
+                last_name=f"User {i}",
+                password=self.password,
+                **fields,
+            )
+            for i in range(number)
+        )
+        return list(
+            User.objects.filter(username__startswith=prefix).order_by("id")
+        )
+
+    def create_statuses(self, number):
+        prefix = f"bench-{next(self.batches)}-"
+        Status.objects.bulk_create(
+            Status(name=f"{prefix}{i}") for i in range(number)
+        )
+        # bulk_create() doesn't send post_save.
+        invalidate()
+        return list(
+            Status.objects.filter(name__startswith=prefix).order_by("id")
+        )
+
+    def create_tasks(self, number):
+        """
+        Spreads `number` tasks over the seeded statuses and users, in
+        batches: a million model instances don't fit in memory at once.
+        """
+        users, statuses = self.users, self.statuses
+
+        for start in range(0, number, BATCH_SIZE):
+            Task.objects.bulk_create(
+                Task(
+                    name=f"bench-task-{i}",
+                    status=statuses[i % len(statuses)],
+                    author=users[i % len(users)],
+                    executor=users[(i * 7 + 1) % len(users)],
+                )
+                for i in range(start, min(start + BATCH_SIZE, number))
+            )
+
+    def sessions(self, number):
+        users = self.create_users(number)
+        return [(user, self.login(user)) for user in users]
+
+    @staticmethod
+    def login(user):
+        client = Client()
+        client.force_login(user)
+        return client.cookies[settings.SESSION_COOKIE_NAME].value
+
+    def request(
+        self,
+        method,
+        name,
+        kwargs=None,
+        session=None,
+        query=None,
+        data=None,
+        body=b"",
+        content_type="application/x-www-form-urlencoded",
+    ):
+        path = reverse(name, kwargs=kwargs)
+        if query:
+            path = f"{path}?{urlencode(query)}"
+
+        cookies = {settings.CSRF_COOKIE_NAME: self.csrf_token}
+        if session:
+            cookies[settings.SESSION_COOKIE_NAME] = session
+        headers = {
+            "Cookie": "; ".join(f"{k}={v}" for k, v in cookies.items())
+        }
+
+        if method == "POST":
+            headers["X-CSRFToken"] = self.csrf_token
+            headers["Content-Type"] = content_type
+            if data is not None:
+                body = urlencode(data).encode()
+
+        return build_request(method, path, self.host, headers, body)
+
+
+def get_scenarios(fixtures, total):
+    """
+    Returns {scenario: (url name, expected status, requests)}, building
+    (and seeding for) only what a run of `total` requests per scenario
+    needs. Scenarios are built lazily, one at a time.
+    """
+    f = fixtures
+    user, session = f.user, f.session
+    status = f.statuses[0]
+    unique = count()
+
+    def form(extra=None):
+        return {
+            "first_name": "Bench",
+            "last_name": "User",
+            "password1": PASSWORD,
+            "password2": PASSWORD,
+            **(extra or {}),
+        }
+
+    return {
+        "GET main": lambda: ("main", 200, [f.request("GET", "main")]),
+        "GET login": lambda: ("login", 200, [f.request("GET", "login")]),
+        "POST login": lambda: (
+            "login",
+            302,
+            [
+                f.request(
+                    "POST",
+                    "login",
+                    data={"username": user.username, "password": PASSWORD},
+                )
+            ],
+        ),
+        "POST logout": lambda: (
+            "logout",
+            302,
+            [
+                f.request("POST", "logout", session=s)
+                for _, s in f.sessions(total)
+            ],
+        ),
+        "GET tasks": lambda: (
+            "tasks",
+            200,
+            [f.request("GET", "tasks", session=session)],
+        ),
+        "GET tasks filtered": lambda: (
+            "tasks",
+            200,
+            [
+                f.request(
+                    "GET",
+                    "tasks",
+                    session=session,
+                    query={"status": status.id, "executor": user.username},
+                )
+            ],
+        ),
+        "GET users": lambda: ("users", 200, [f.request("GET", "users")]),
+        "GET users search": lambda: (
+            "users",
+            200,
+            [f.request("GET", "users", query={"q": "bench-0-1"})],
+        ),
+        "GET api_users": lambda: (
+            "api_users",
+            200,
+            [f.request("GET", "api_users")],
+        ),
+        "GET export_users": lambda: (
+            "export_users",
+            200,
+            [f.request("GET", "export_users", session=session)],
+        ),
+        "GET create_user": lambda: (
+            "create_user",
+            200,
+            [f.request("GET", "create_user")],
+        ),
+        "POST create_user": lambda: (
+            "create_user",
+            302,
+            [
+                f.request(
+                    "POST",
+                    "create_user",
+                    data=form({"username": f"bench-new-{next(unique)}"}),
+                )
+                for _ in range(total)
+            ],
+        ),
+        "GET update_user": lambda: (
+            "update_user",
+            200,
+            [
+                f.request(
+                    "GET",
+                    "update_user",
+                    {"pk": user.id},
+                    session=session,
+                )
+            ],
+        ),
+        # A password change ends the other sessions of the user.
+        "POST update_user": lambda: (
+            "update_user",
+            302,
+            [
+                f.request(
+                    "POST",
+                    "update_user",
+                    {"pk": u.id},
+                    session=s,
+                    data=form({"username": u.username}),
+                )
+                for u, s in f.sessions(total)
+            ],
+        ),
+        "GET delete_user": lambda: (
+            "delete_user",
+            200,
+            [
+                f.request(
+                    "GET",
+                    "delete_user",
+                    {"pk": user.id},
+                    session=session,
+                )
+            ],
+        ),
+        "POST delete_user": lambda: (
+            "delete_user",
+            302,
+            [
+                f.request("POST", "delete_user", {"pk": u.id}, session=s)
+                for u, s in f.sessions(total)
+            ],
+        ),
+        "GET statuses": lambda: (
+            "statuses",
+            200,
+            [f.request("GET", "statuses", session=session)],
+        ),
+        "GET statuses search": lambda: (
+            "statuses",
+            200,
+            [
+                f.request(
+                    "GET", "statuses", session=session, query={"q": "bench"}
+                )
+            ],
+        ),
+        "GET api_statuses": lambda: (
+            "api_statuses",
+            200,
+            [f.request("GET", "api_statuses", session=session)],
+        ),
+        "GET create_status": lambda: (
+            "create_status",
+            200,
+            [f.request("GET", "create_status", session=session)],
+        ),
+        "POST create_status": lambda: (
+            "create_status",
+            302,
+            [
+                f.request(
+                    "POST",
+                    "create_status",
+                    session=session,
+                    data={"name": f"bench-new-{next(unique)}"},
+                )
+                for _ in range(total)
+            ],
+        ),
+        "GET update_status": lambda: (
+            "update_status",
+            200,
+            [
+                f.request(
+                    "GET",
+                    "update_status",
+                    {"pk": status.id},
+                    session=session,
+                )
+            ],
+        ),
+        "POST update_status": lambda: (
+            "update_status",
+            302,
+            [
+                f.request(
+                    "POST",
+                    "update_status",
+                    {"pk": f.statuses[i % len(f.statuses)].id},
+                    session=session,
+                    data={"name": f"bench-renamed-{next(unique)}"},
+                )
+                for i in range(total)
+            ],
+        ),
+        "GET delete_status": lambda: (
+            "delete_status",
+            200,
+            [
+                f.request(
+                    "GET",
+                    "delete_status",
+                    {"pk": status.id},
+                    session=session,
+                )
+            ],
+        ),
+        "POST delete_status": lambda: (
+            "delete_status",
+            302,
+            [
+                f.request(
+                    "POST",
+                    "delete_status",
+                    {"pk": s.id},
+                    session=session,
+                )
+                for s in f.create_statuses(total)
+            ],
+        ),
+        "GET bulk_statuses": lambda: (
+            "bulk_statuses",
+            200,
+            [f.request("GET", "bulk_statuses", session=session)],
+        ),
+        "POST bulk_statuses": lambda: (
+            "bulk_statuses",
+            201,
+            [
+                f.request(
+                    "POST",
+                    "bulk_statuses",
+                    session=session,
+                    body=f"name\nbench-bulk-{next(unique)}\n".encode(),
+                    content_type="text/csv",
+                )
+                for _ in range(total)
+            ],
+        ),
+        "GET metrics": lambda: (
+            "metrics",
+            200,
+            [f.request("GET", "metrics", session=f.staff_session)],
+        ),
+    }
+
+
+def get_route_names(resolver=None, namespace=None):
+    """Names of all routes of the URLconf, without the admin's."""
+    names = set()
+
+    for pattern in (resolver or get_resolver()).url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace in EXCLUDED_NAMESPACES:
+                continue
+            names |= get_route_names(pattern, pattern.namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            prefix = f"{namespace}:" if namespace else ""
+            names.add(prefix + pattern.name)
+
+    return names
@@ -0,0 +1,81 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.checks import Error, Info, Tags, register
+from django.utils.module_loading import import_string
+
+from task_manager import warmup
+from task_manager.hashers import get_cost
+
+# Optional dependencies (pyproject.toml extras) by hasher library.
+EXTRAS = {"argon2": "argon2", "bcrypt": "bcrypt"}
+
+
+@register(Tags.templates, deploy=True)
+def check_templates(app_configs, **kwargs):
+    """
+    Compiles the project's templates from a cold cache and reports the
+    compile time of each, slowest first:
+
+        python manage.py check --deploy --tag templates
+    """
+    warmup.reset_templates()
+    timings, errors = warmup.compile_templates()
+    messages = [
+        Error(str(exc), obj=name, id="task_manager.E001")
+        for name, exc in errors.items()
+    ]
+
+    for name, ms in sorted(timings.items(), key=lambda item: -item[1]):
+        messages.append(
+            Info(f"Compiled in {ms:.2f}ms.", obj=name, id="task_manager.I001")
+        )
+    messages.append(
+        Info(
+            f"{len(timings)} templates compiled in "
+            f"{sum(timings.values()):.2f}ms.",
+            id="task_manager.I002",
+        )
+    )
+    return messages
+
+
+@register(Tags.security)
+def check_password_hasher(app_configs, **kwargs):
+    """
+    The preferred hasher must be importable with its library installed
+    and PASSWORD_HASHER_COST valid for it. Otherwise the first login or
+    registration fails; `make release` (migrate) runs this check first.
+    """
+    path = settings.PASSWORD_HASHERS[0]
+    hasher = import_string(path)
+    messages = []
+
+    if hasher.library:
+        module = hasher.library
+        if isinstance(module, tuple):
+            module = module[1]
+        try:
+            import_module(module)
+        except ImportError:
+            extra = EXTRAS.get(module)
+            messages.append(
+                Error(
+                    f"{path} needs the {module} package.",
+                    hint=extra and f"poetry install -E {extra}",
+                    id="task_manager.E002",
+                )
+            )
+
+    cost = get_cost(hasher)
+    if settings.PASSWORD_HASHER_COST and cost:
+        error = cost.get_error(settings.PASSWORD_HASHER_COST)
+        if error:
+            messages.append(
+                Error(
+                    f"PASSWORD_HASHER_COST {error} for {path}.",
+                    id="task_manager.E003",
+                )
+            )
+
+    return messages
@@ -0,0 +1,64 @@
+"""
+Conditional GET support for the list pages and the JSON API.
+
+Views compute their validators from something cheap (the cached status
+catalogue, the rows of the requested page), answer a matching
+If-None-Match / If-Modified-Since with 304 before rendering, and ask
+clients to revalidate before every reuse.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.translation import get_language
+
+
+def make_etag(*parts):
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def page_etag(request, *parts):
+    """
+    ETag of an HTML page showing `parts`. It also covers what the layout
+    depends on: the user, the language and the CSRF cookie the logout
+    form is rendered with. Returns None while flash messages are pending,
+    those pages are always rendered: send no Last-Modified with them
+    either.
+    """
+    if len(get_messages(request)):
+        return None
+
+    return make_etag(
+        parts,
+        request.user.pk,
+        get_language(),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+    )
+
+
+def not_modified(request, etag=None, last_modified=None):
+    """Returns a 304 response if the client's copy is current, else None."""
+    if etag is None and last_modified is None:
+        return None
+
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified and int(last_modified.timestamp()),
+    )
+
+
+def set_validators(response, etag=None, last_modified=None, private=False):
+    if etag is not None:
+        response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+
+    patch_cache_control(response, no_cache=True)
+    if private:
+        patch_cache_control(response, private=True)
+
+    return response
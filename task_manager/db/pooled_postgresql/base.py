@@ -0,0 +1,108 @@
+"""
+PostgreSQL backend that keeps an in-process pool of open connections.
+
+Django still "closes" the connection at the end of every request
+(CONN_MAX_AGE = 0), but closing hands it back to the pool instead of
+tearing down the socket, so the next request skips the TCP/TLS handshake
+and authentication. The pool is created lazily, i.e. after gunicorn forks.
+
+Up to MAX_SIZE connections are kept open once made; MIN_SIZE of them
+are opened up front. When all MAX_SIZE are in use, a request waits up to
+TIMEOUT seconds for one to be handed back before failing.
+"""
+import threading
+
+import psycopg2.extras
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+from django.db.backends.postgresql import base
+
+
+_pools = {}
+_lock = threading.Lock()
+
+
+class BlockingConnectionPool(ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool raises PoolError as soon as it's exhausted;
+    this one waits for a connection to be put back first. It also only
+    keeps minconn idle connections and closes any other handed back; this
+    one keeps them all (there are never more than maxconn).
+    """
+
+    def __init__(self, minconn, maxconn, *args, timeout=None, **kwargs):
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._timeout = timeout
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        if not self._slots.acquire(timeout=self._timeout):
+            raise PoolError(
+                f"connection pool exhausted for {self._timeout} seconds"
+            )
+        try:
+            return super().getconn(key)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _putconn(self, conn, key=None, close=False):
+        # Called with the pool's lock held.
+        minconn, self.minconn = self.minconn, self.maxconn
+        try:
+            super()._putconn(conn, key, close)
+        finally:
+            self.minconn = minconn
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._slots.release()
+
+
+def get_pool(alias, conn_params, options):
+    with _lock:
+        if alias not in _pools:
+            _pools[alias] = BlockingConnectionPool(
+                options.get("MIN_SIZE", 1),
+                options.get("MAX_SIZE", 4),
+                timeout=options.get("TIMEOUT", 10),
+                **conn_params,
+            )
+        return _pools[alias]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    @property
+    def pool(self):
+        return get_pool(
+            self.alias,
+            self.get_connection_params(),
+            self.settings_dict.get("POOL", {}),
+        )
+
+    def get_new_connection(self, conn_params):
+        connection = self.pool.getconn()
+
+        # Same session setup as the stock backend does for a new connection.
+        options = self.settings_dict["OPTIONS"]
+        try:
+            self.isolation_level = options["isolation_level"]
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # putconn() rolls back an open transaction and drops
+                # connections in an unknown state.
+                return self.pool.putconn(
+                    self.connection, close=self.errors_occurred
+                )
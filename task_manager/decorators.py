@@ -0,0 +1,88 @@
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.middleware.cache import CacheMiddleware
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+
+def is_cacheable(request):
+    return bool(
+        settings.PAGE_CACHE_TIMEOUT
+        and not request.user.is_authenticated
+        and not len(get_messages(request))
+    )
+
+
+def revalidate(request, response):
+    if "Expires" in response:
+        del response["Expires"]
+    patch_cache_control(response, max_age=0)
+    # A cached page is served without calling the view,
+    # so it is revalidated here.
+    return get_conditional_response(
+        request, etag=response.get("ETag"), response=response
+    )
+
+
+def cache_anonymous_page(view):
+    """
+    Serve the page from the PAGE_CACHE_ALIAS cache for anonymous visitors.
+
+    Authenticated users and requests with pending flash messages always
+    get a fresh render. The response keeps `Vary: Cookie` from the session
+    middleware, and clients are told to revalidate instead of reusing it
+    for the whole PAGE_CACHE_TIMEOUT, since the same URL looks different
+    once they sign in.
+
+    Works for sync and async views; apply it to the as_view() result,
+    method_decorator() would hide an async handler from View.
+    """
+    # One cache middleware per timeout, i.e. one unless a test
+    # overrides PAGE_CACHE_TIMEOUT.
+    middlewares = {}
+
+    def get_middleware():
+        timeout = settings.PAGE_CACHE_TIMEOUT
+        if timeout not in middlewares:
+            middlewares[timeout] = CacheMiddleware(
+                view,
+                page_timeout=timeout,
+                cache_alias=settings.PAGE_CACHE_ALIAS,
+            )
+        return middlewares[timeout]
+
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if not await sync_to_async(is_cacheable)(request):
+                return await view(request, *args, **kwargs)
+
+            middleware = get_middleware()
+            response = await sync_to_async(middleware.process_request)(
+                request
+            )
+            if response is None:
+                response = await view(request, *args, **kwargs)
+                response = await sync_to_async(middleware.process_response)(
+                    request, response
+                )
+            return revalidate(request, response)
+
+        return wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not is_cacheable(request):
+            return view(request, *args, **kwargs)
+
+        middleware = get_middleware()
+        response = middleware.process_request(request)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            response = middleware.process_response(request, response)
+        return revalidate(request, response)
+
+    return wrapper
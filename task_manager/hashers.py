@@ -0,0 +1,67 @@
+"""
+Password hashers with a cost taken from settings.
+
+They keep the algorithm names of the stock Django hashers, so existing
+hashes stay valid. PASSWORD_HASHER_COST overrides the cost parameter of
+whichever of them is the preferred hasher (first in PASSWORD_HASHERS);
+hashes made with another algorithm or cost are upgraded on the next
+successful login by Django's check_password().
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class Cost:
+    def __init__(self, default, minimum=1, maximum=None, power_of_2=False):
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.power_of_2 = power_of_2
+
+    def __get__(self, instance, owner):
+        path = f"{owner.__module__}.{owner.__qualname__}"
+        cost = settings.PASSWORD_HASHER_COST
+
+        if cost and settings.PASSWORD_HASHERS[0] == path:
+            return cost
+        return self.default
+
+    def get_error(self, cost):
+        """Why `cost` can't be used, or None."""
+        if cost < self.minimum:
+            return f"must be at least {self.minimum}"
+        if self.maximum is not None and cost > self.maximum:
+            return f"must be at most {self.maximum}"
+        if self.power_of_2 and cost & (cost - 1):
+            return "must be a power of 2"
+        return None
+
+
+def get_cost(hasher_class):
+    """The Cost of a hasher class, None for those without one."""
+    for cls in hasher_class.__mro__:
+        for value in vars(cls).values():
+            if isinstance(value, Cost):
+                return value
+    return None
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    iterations = Cost(hashers.PBKDF2PasswordHasher.iterations)
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    work_factor = Cost(
+        hashers.ScryptPasswordHasher.work_factor, minimum=2, power_of_2=True
+    )
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    time_cost = Cost(hashers.Argon2PasswordHasher.time_cost)
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    # bcrypt's log2 rounds.
+    rounds = Cost(
+        hashers.BCryptSHA256PasswordHasher.rounds, minimum=4, maximum=31
+    )
@@ -0,0 +1,84 @@
+"""
+Minimal asyncio HTTP/1.1 load generator used by the bench commands.
+
+It only needs the standard library, keeps exactly `concurrency` requests
+in flight and opens a fresh connection per request, like a crowd of
+independent browsers would.
+"""
+import asyncio
+from statistics import quantiles
+from time import perf_counter
+
+
+async def fetch(host, port, request):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(request)
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+    finally:
+        writer.close()
+
+    return int(status_line.split()[1])
+
+
+def build_request(method, path, host, headers=None, body=b""):
+    lines = [f"{method} {path} HTTP/1.1", f"Host: {host}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    if body:
+        lines.append(f"Content-Length: {len(body)}")
+    lines.append("Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+
+async def run(host, port, paths, total, concurrency, server_name=None):
+    """
+    Requests `paths` round robin until `total` requests are done and
+    returns throughput, latency percentiles (ms) and the status codes.
+    """
+    requests = [
+        build_request("GET", path, server_name or host) for path in paths
+    ]
+    return await run_requests(host, port, requests, total, concurrency)
+
+
+async def run_requests(host, port, requests, total, concurrency):
+    """
+    Like run() with raw requests built by build_request(). The i-th
+    request sent is requests[i % len(requests)].
+    """
+    latencies = []
+    statuses = {}
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            start = perf_counter()
+            try:
+                status = await fetch(host, port, requests[i % len(requests)])
+            except (OSError, IndexError, ValueError):
+                status = "error"
+            latencies.append((perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = perf_counter() - start
+
+    return summarize(latencies, elapsed, statuses)
+
+
+def summarize(latencies, elapsed, statuses=None):
+    if len(latencies) > 1:
+        cuts = quantiles(latencies, n=100)
+    else:
+        cuts = latencies * 99
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(cuts[49], 2),
+        "p95_ms": round(cuts[94], 2),
+        "p99_ms": round(cuts[98], 2),
+        "statuses": {str(k): v for k, v in (statuses or {}).items()},
+    }
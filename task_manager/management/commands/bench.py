@@ -0,0 +1,218 @@
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer
+from django.db import connection
+from django.test.testcases import QuietWSGIRequestHandler
+from django.test.utils import override_settings
+
+from task_manager import loadgen, metrics
+from task_manager.bench import Fixtures, get_route_names, get_scenarios
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database, serve the app from a local threaded "
+        "WSGI server and request every route at the given concurrency. "
+        "Prints throughput, latency percentiles and queries per request "
+        "as JSON; with --compare, fails on regressions against a report "
+        "saved from another commit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--statuses", type=int, default=100)
+        parser.add_argument("--tasks", type=int, default=10000)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument(
+            "--scenarios", nargs="+", help="Run only these scenarios."
+        )
+        parser.add_argument("--output", help="Also write the report here.")
+        parser.add_argument("--compare", help="A report to compare with.")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=25,
+            help="Allowed p95 latency growth against --compare, in %%.",
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                baseline = json.load(file)
+
+        report = {
+            "commit": self.get_commit(),
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "cpus": os.cpu_count(),
+            "users": options["users"],
+            "statuses": options["statuses"],
+            "tasks": options["tasks"],
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+        }
+
+        with self.test_database(), override_settings(METRICS_ENABLED=True):
+            report["scenarios"] = self.run(options)
+
+        report["uncovered_routes"] = self.get_uncovered_routes(
+            report["scenarios"]
+        )
+        report["scenarios"] = {
+            name: result for name, (_, result) in report["scenarios"].items()
+        }
+
+        regressions = []
+        if baseline:
+            regressions = self.compare(
+                baseline, report, options["tolerance"]
+            )
+            report["baseline_commit"] = baseline.get("commit")
+            report["regressions"] = regressions
+
+        output = json.dumps(report, indent=2)
+        self.stdout.write(output)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+
+        if regressions:
+            raise CommandError(f"{len(regressions)} regression(s) found.")
+
+    def run(self, options):
+        server = ThreadedWSGIServer(
+            ("127.0.0.1", 0), QuietWSGIRequestHandler
+        )
+        server.set_app(WSGIHandler())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+
+        try:
+            fixtures = Fixtures(settings.ALLOWED_HOSTS[0])
+            fixtures.seed(
+                options["users"], options["statuses"], options["tasks"]
+            )
+            scenarios = get_scenarios(fixtures, options["requests"])
+
+            results = {}
+            for name in options["scenarios"] or scenarios:
+                if name not in scenarios:
+                    raise CommandError(f"Unknown scenario: {name}")
+                route, expected, requests = scenarios[name]()
+                results[name] = (
+                    route,
+                    self.run_scenario(host, port, requests, expected, options),
+                )
+            return results
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    @staticmethod
+    def run_scenario(host, port, requests, expected, options):
+        metrics.reset()
+        result = asyncio.run(
+            loadgen.run_requests(
+                host,
+                port,
+                requests,
+                options["requests"],
+                options["concurrency"],
+            )
+        )
+
+        routes = metrics.snapshot().values()
+        count = sum(route["queries"]["count"] for route in routes)
+        queries = sum(route["queries"]["sum"] for route in routes)
+        result["queries_per_request"] = round(queries / max(count, 1), 2)
+        result["expected_status"] = expected
+        result["unexpected"] = result["requests"] - result["statuses"].get(
+            str(expected), 0
+        )
+        return result
+
+    @staticmethod
+    def get_uncovered_routes(results):
+        """Routes no scenario of `results` (name -> (route, result)) hit."""
+        covered = {route for route, _ in results.values()}
+        return sorted(get_route_names() - covered)
+
+    @staticmethod
+    def compare(baseline, report, tolerance):
+        regressions = []
+
+        for name, result in report["scenarios"].items():
+            before = baseline.get("scenarios", {}).get(name)
+            if before is None:
+                continue
+
+            if result["queries_per_request"] > before["queries_per_request"]:
+                regressions.append(
+                    f"{name}: queries per request "
+                    f"{before['queries_per_request']} -> "
+                    f"{result['queries_per_request']}"
+                )
+            if result["p95_ms"] > before["p95_ms"] * (1 + tolerance / 100):
+                regressions.append(
+                    f"{name}: p95 {before['p95_ms']}ms -> "
+                    f"{result['p95_ms']}ms"
+                )
+            if result["unexpected"] > before["unexpected"]:
+                regressions.append(
+                    f"{name}: {result['unexpected']} responses other "
+                    f"than {result['expected_status']}"
+                )
+
+        return regressions
+
+    @staticmethod
+    def get_commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    @staticmethod
+    @contextmanager
+    def test_database():
+        """
+        A fresh database named after the configured one, like the test
+        runner's. SQLite gets a file, the server threads can't share an
+        in-memory database.
+        """
+        old_name = connection.settings_dict["NAME"]
+        test_settings = connection.settings_dict["TEST"]
+        old_test_name = test_settings.get("NAME")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            if connection.vendor == "sqlite":
+                test_settings["NAME"] = os.path.join(tmpdir, "bench.sqlite3")
+            try:
+                connection.creation.create_test_db(
+                    verbosity=0, autoclobber=True, serialize=False
+                )
+                try:
+                    yield
+                finally:
+                    connection.creation.destroy_test_db(
+                        old_name, verbosity=0
+                    )
+            finally:
+                test_settings["NAME"] = old_test_name
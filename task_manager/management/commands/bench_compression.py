@@ -0,0 +1,86 @@
+import json
+from time import process_time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from task_manager.middleware import BrotliCompressor, GzipCompressor
+
+
+class Command(BaseCommand):
+    help = (
+        "Request the user list at several page sizes without compression, "
+        "with gzip and with brotli, and report the bytes on the wire, the "
+        "CPU time of a response and of compressing it. The seeded users "
+        "are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page-sizes", type=int, nargs="+", default=[10, 50, 200, 500]
+        )
+        parser.add_argument("--requests", type=int, default=50)
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        url = reverse("users")
+        report = {
+            "gzip_level": settings.COMPRESS_GZIP_LEVEL,
+            "brotli_quality": settings.COMPRESS_BROTLI_QUALITY,
+        }
+
+        with transaction.atomic():
+            User.objects.bulk_create(
+                User(
+                    username=f"bench-{i}",
+                    first_name="Firstname",
+                    last_name=f"Lastname {i}",
+                )
+                for i in range(max(options["page_sizes"]))
+            )
+
+            for page_size in options["page_sizes"]:
+                report[f"page_size={page_size}"] = self.run(
+                    client, url, page_size, options["requests"]
+                )
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    @staticmethod
+    def run(client, url, page_size, requests):
+        params = {"page_size": page_size}
+
+        start = process_time()
+        for _ in range(requests):
+            resp = client.get(url, params, HTTP_ACCEPT_ENCODING="identity")
+        body = resp.content
+        results = {
+            "identity": {
+                "bytes": len(body),
+                "response_cpu_ms": round(
+                    (process_time() - start) * 1000 / requests, 3
+                ),
+            }
+        }
+
+        # The compression cost alone, it is lost in the noise of
+        # rendering when timing whole responses.
+        for compressor_class in (GzipCompressor, BrotliCompressor):
+            start = process_time()
+            for _ in range(requests):
+                compressor = compressor_class()
+                compressed = compressor.process(body) + compressor.finish()
+            results[compressor_class.encoding] = {
+                "bytes": len(compressed),
+                "compress_cpu_ms": round(
+                    (process_time() - start) * 1000 / requests, 3
+                ),
+            }
+
+        return results
@@ -0,0 +1,68 @@
+import json
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    help = (
+        "Request the user list repeatedly with per-request connections "
+        "(CONN_MAX_AGE=0) and with persistent ones, and report the "
+        "connection setup time saved per request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--conn-max-age", type=int, default=600)
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        url = reverse("users")
+        report = {
+            "engine": connection.settings_dict["ENGINE"],
+            "requests": options["requests"],
+        }
+
+        for label, conn_max_age in (
+            ("per_request", 0),
+            ("persistent", options["conn_max_age"]),
+        ):
+            connection.close()
+            connection.settings_dict["CONN_MAX_AGE"] = conn_max_age
+            report[label] = self.run(client, url, options["requests"])
+
+        report["saved_ms_per_request"] = round(
+            report["per_request"]["ms_per_request"]
+            - report["persistent"]["ms_per_request"],
+            3,
+        )
+        self.stdout.write(json.dumps(report, indent=2))
+
+    @staticmethod
+    def run(client, url, requests):
+        opened = []
+
+        def count(sender, **kwargs):
+            opened.append(sender)
+
+        connection_created.connect(count)
+        try:
+            start = perf_counter()
+            for _ in range(requests):
+                client.get(url)
+                # The test client skips this on request_finished;
+                # a real WSGI server doesn't.
+                close_old_connections()
+            elapsed = perf_counter() - start
+        finally:
+            connection_created.disconnect(count)
+
+        return {
+            "connections_opened": len(opened),
+            "ms_per_request": round(elapsed * 1000 / requests, 3),
+        }
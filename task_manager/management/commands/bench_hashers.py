@@ -0,0 +1,80 @@
+import json
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from task_manager.loadgen import summarize
+
+PASSWORD = "Pukote74."
+
+
+class Command(BaseCommand):
+    help = (
+        "Log in through the login view repeatedly with each password "
+        "hasher profile and report p50/p99 latency. Profiles whose "
+        "library isn't installed are skipped. Nothing is saved."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=50)
+        parser.add_argument(
+            "--profiles",
+            nargs="+",
+            choices=list(settings.PASSWORD_HASHER_PROFILES),
+            default=list(settings.PASSWORD_HASHER_PROFILES),
+        )
+
+    def handle(self, *args, **options):
+        report = {"cost": settings.PASSWORD_HASHER_COST}
+
+        for profile in options["profiles"]:
+            path = settings.PASSWORD_HASHER_PROFILES[profile]
+            with override_settings(PASSWORD_HASHERS=[path]):
+                hasher = get_hasher()
+                try:
+                    if hasher.library:
+                        hasher._load_library()
+                except ValueError as e:
+                    report[profile] = {"skipped": str(e)}
+                    continue
+
+                report[profile] = self.run(options["logins"])
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    @staticmethod
+    def run(logins):
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        url = reverse("login")
+        latencies = []
+        statuses = {}
+
+        with transaction.atomic():
+            user = User(username="bench_hashers")
+            user.set_password(PASSWORD)
+            user.save()
+
+            start = perf_counter()
+            for _ in range(logins):
+                client.cookies.clear()
+                began = perf_counter()
+                resp = client.post(
+                    url, {"username": user.username, "password": PASSWORD}
+                )
+                latencies.append((perf_counter() - began) * 1000)
+                statuses[resp.status_code] = (
+                    statuses.get(resp.status_code, 0) + 1
+                )
+            elapsed = perf_counter() - start
+
+            summary = summarize(latencies, elapsed, statuses)
+            summary["hash"] = user.password.split("$", 1)[0]
+            transaction.set_rollback(True)
+
+        return summary
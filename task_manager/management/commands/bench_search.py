@@ -0,0 +1,92 @@
+import json
+import random
+import string
+from statistics import quantiles
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from task_manager.search import search
+from task_manager.user.views import USER_SEARCH_FIELDS, get_users
+
+
+def random_word(rng, length):
+    return "".join(rng.choices(string.ascii_lowercase, k=length))
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed users with random names and time the first page of user "
+        "searches by query length, through the search indexes and as "
+        "an unindexed icontains scan. The seeded users are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100000)
+        parser.add_argument("--lookups", type=int, default=200)
+        parser.add_argument(
+            "--query-lengths", type=int, nargs="+", default=[1, 2, 3, 5]
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        report = {"users": options["users"]}
+
+        with transaction.atomic():
+            User.objects.bulk_create(
+                (
+                    User(
+                        username=f"{random_word(rng, 8)}{i}",
+                        first_name=random_word(rng, 6).title(),
+                        last_name=random_word(rng, 8).title(),
+                    )
+                    for i in range(options["users"])
+                ),
+                batch_size=10000,
+            )
+
+            for length in options["query_lengths"]:
+                queries = [
+                    random_word(rng, length) for _ in range(options["lookups"])
+                ]
+                report[f"query_length={length}"] = {
+                    "indexed": self.time(queries, self.search),
+                    "scan": self.time(queries, self.scan),
+                }
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    @staticmethod
+    def search(query):
+        return search(get_users(), USER_SEARCH_FIELDS, query)
+
+    @staticmethod
+    def scan(query):
+        match = Q()
+        for field in USER_SEARCH_FIELDS:
+            match |= Q(**{f"{field}__icontains": query})
+        return get_users().filter(match).order_by("username", "id")
+
+    @staticmethod
+    def time(queries, get_queryset):
+        timings = []
+        rows = 0
+
+        for query in queries:
+            start = perf_counter()
+            rows += len(get_queryset(query)[: settings.PAGE_SIZE + 1])
+            timings.append((perf_counter() - start) * 1000)
+
+        cuts = quantiles(timings, n=100)
+        return {
+            "p50_ms": round(cuts[49], 2),
+            "p95_ms": round(cuts[94], 2),
+            "max_ms": round(max(timings), 2),
+            "rows_per_page": round(rows / len(queries), 1),
+        }
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager import loadgen
+
+
+SERVERS = {
+    "wsgi": ["gunicorn", "-k", "sync", "task_manager.wsgi"],
+    "asgi": [
+        "gunicorn",
+        "-k",
+        "uvicorn.workers.UvicornWorker",
+        "task_manager.asgi",
+    ],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Start the app under sync gunicorn workers and under uvicorn "
+        "workers in turn and hit the list pages with the same number "
+        "of concurrent connections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=500)
+        parser.add_argument("--requests", type=int, default=5000)
+        parser.add_argument("--workers", type=int, default=5)
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--paths", nargs="+", default=["/", "/users/"])
+
+    def handle(self, *args, **options):
+        report = {
+            "concurrency": options["concurrency"],
+            "workers": options["workers"],
+        }
+
+        for mode, command in SERVERS.items():
+            server = self.start(command, options)
+            try:
+                report[mode] = asyncio.run(
+                    loadgen.run(
+                        "127.0.0.1",
+                        options["port"],
+                        options["paths"],
+                        options["requests"],
+                        options["concurrency"],
+                        settings.ALLOWED_HOSTS[0],
+                    )
+                )
+            finally:
+                server.terminate()
+                server.wait()
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    @staticmethod
+    def start(command, options):
+        address = ("127.0.0.1", options["port"])
+        bind = "{}:{}".format(*address)
+        server = subprocess.Popen(
+            command[:1]
+            + ["-w", str(options["workers"]), "-b", bind]
+            + ["--log-level", "error"]
+            + command[1:],
+            env=os.environ.copy(),
+        )
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(address).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+
+        server.terminate()
+        raise CommandError(f"{' '.join(command)} did not start on {bind}")
@@ -0,0 +1,55 @@
+import json
+from time import perf_counter
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+
+TEMPLATES = ["main.html", "user/users.html", "status/statuses.html"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time rendering of the pages with the layout fragments "
+        "re-rendered every time (cold) and served from the cache (warm)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=500)
+
+    def handle(self, *args, **options):
+        fragments = caches["template_fragments"]
+        users = {"anonymous": AnonymousUser(), "authenticated": User(id=1)}
+        report = {}
+
+        for template in TEMPLATES:
+            for label, user in users.items():
+                request = RequestFactory().get("/")
+                request.user = user
+                report[f"{template} ({label})"] = {
+                    "cold_ms": self.timeit(
+                        template, request, options["repeat"], fragments.clear
+                    ),
+                    "warm_ms": self.timeit(
+                        template, request, options["repeat"]
+                    ),
+                }
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    @staticmethod
+    def timeit(template, request, repeat, before=None):
+        render_to_string(template, request=request)
+        elapsed = 0
+
+        for _ in range(repeat):
+            if before:
+                before()
+            start = perf_counter()
+            render_to_string(template, request=request)
+            elapsed += perf_counter() - start
+
+        return round(elapsed * 1000 / repeat, 3)
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import os
+import subprocess
+import time
+from http.client import HTTPConnection
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager import loadgen
+
+
+# Overrides of gunicorn.conf.py (environment variables) per setup.
+SETUPS = {
+    "sync": {"GUNICORN_WORKER_CLASS": "sync", "GUNICORN_PRELOAD": "0"},
+    "gthread": {"GUNICORN_WORKER_CLASS": "gthread", "GUNICORN_PRELOAD": "0"},
+    "gthread+preload": {"GUNICORN_WORKER_CLASS": "gthread"},
+    "uvicorn+preload": {
+        "GUNICORN_WORKER_CLASS": "uvicorn.workers.UvicornWorker"
+    },
+}
+SMAPS_FIELDS = ("Rss", "Pss", "Private_Clean", "Private_Dirty")
+
+
+def get_children(pid):
+    children = []
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as file:
+                # The command name may contain spaces, it's in parentheses.
+                fields = file.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(name))
+    return sorted(children)
+
+
+def get_memory_kb(pid):
+    """Rss, Pss and Uss (private pages) of a process, in kB."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as file:
+        for line in file:
+            name, _, rest = line.partition(":")
+            if name in SMAPS_FIELDS:
+                values[name] = int(rest.split()[0])
+
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "uss": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def measure(master, workers):
+    per_worker = [get_memory_kb(pid) for pid in workers]
+    return {
+        "master_kb": get_memory_kb(master),
+        "worker_avg_kb": {
+            key: round(sum(m[key] for m in per_worker) / len(per_worker))
+            for key in ("rss", "pss", "uss")
+        },
+        "total_pss_kb": get_memory_kb(master)["pss"]
+        + sum(m["pss"] for m in per_worker),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Start gunicorn with gunicorn.conf.py under several worker "
+        "setups and report the time to the first response and the "
+        "memory of the workers (RSS, PSS, USS from /proc) once booted "
+        "and after serving requests. Linux only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=3)
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--paths", nargs="+", default=["/", "/users/"])
+        parser.add_argument(
+            "--setups", nargs="+", choices=SETUPS, default=list(SETUPS)
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.exists("/proc/self/smaps_rollup"):
+            raise CommandError("/proc/<pid>/smaps_rollup is not available.")
+
+        report = {"workers": options["workers"]}
+        for name in options["setups"]:
+            report[name] = self.run(SETUPS[name], options)
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run(self, setup, options):
+        env = {
+            **os.environ,
+            **setup,
+            "WEB_CONCURRENCY": str(options["workers"]),
+            "PORT": str(options["port"]),
+        }
+        start = time.monotonic()
+        server = subprocess.Popen(
+            ["gunicorn", "--log-level", "error"],
+            cwd=settings.BASE_DIR,
+            env=env,
+        )
+
+        try:
+            self.wait(server, options)
+            result = {"first_response_s": round(time.monotonic() - start, 2)}
+            workers = self.settle(server, options)
+            result["idle"] = measure(server.pid, workers)
+
+            load = asyncio.run(
+                loadgen.run(
+                    "127.0.0.1",
+                    options["port"],
+                    options["paths"],
+                    options["requests"],
+                    options["concurrency"],
+                    settings.ALLOWED_HOSTS[0],
+                )
+            )
+            result["rps"] = load["rps"]
+            result["after_requests"] = measure(server.pid, workers)
+            return result
+        finally:
+            server.terminate()
+            server.wait()
+
+    @staticmethod
+    def wait(server, options):
+        """Waits until a worker answers."""
+        deadline = time.monotonic() + 60
+
+        while time.monotonic() < deadline and server.poll() is None:
+            connection = HTTPConnection("127.0.0.1", options["port"])
+            try:
+                connection.request(
+                    "GET", "/", headers={"Host": settings.ALLOWED_HOSTS[0]}
+                )
+                connection.getresponse().read()
+                return
+            except OSError:
+                time.sleep(0.05)
+            finally:
+                connection.close()
+
+        raise CommandError(f"gunicorn did not start on {options['port']}")
+
+    @staticmethod
+    def settle(server, options):
+        """
+        Waits for all workers to be forked and done booting (their
+        memory stops growing), and returns their pids.
+        """
+        sizes = None
+        while True:
+            time.sleep(0.5)
+            workers = get_children(server.pid)
+            current = [get_memory_kb(pid)["rss"] for pid in workers]
+            if len(workers) == options["workers"] and current == sizes:
+                return workers
+            sizes = current
@@ -0,0 +1,49 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions in small batches. Unlike clearsessions "
+        "no single statement holds locks on the whole expired range."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0,
+            help="Pause between batches, in seconds.",
+        )
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+
+        if not issubclass(store, DBStore):
+            # Cache and cookie sessions expire on their own.
+            store.clear_expired()
+            return
+
+        model = store.get_model_class()
+        now = timezone.now()
+        deleted = 0
+
+        while True:
+            keys = list(
+                model.objects.filter(expire_date__lt=now).values_list(
+                    "pk", flat=True
+                )[: options["batch_size"]]
+            )
+            if not keys:
+                break
+
+            deleted += model.objects.filter(pk__in=keys).delete()[0]
+            time.sleep(options["sleep"])
+
+        self.stdout.write(f"Deleted {deleted} expired sessions")
@@ -0,0 +1,145 @@
+"""
+In-process request metrics.
+
+MetricsMiddleware collects, per request, the wall time, the number and
+time of SQL queries and the template render time. They are aggregated
+per route into fixed-bucket histograms and served as JSON to staff users
+at /metrics/. Each gunicorn worker keeps its own numbers.
+"""
+import threading
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from task_manager.status.cache import get_stats
+
+
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+current = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.start = perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """connection.execute_wrapper() hook."""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_ms += (perf_counter() - start) * 1000
+
+    @property
+    def wall_ms(self):
+        return (perf_counter() - self.start) * 1000
+
+
+class Histogram:
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(BUCKETS_MS):
+            if value <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def as_dict(self):
+        labels = [str(bound) for bound in BUCKETS_MS] + ["+Inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.wall_ms = Histogram()
+        self.db_ms = Histogram()
+        self.template_ms = Histogram()
+        self.queries = Histogram()
+
+    def observe(self, metrics, wall_ms):
+        self.wall_ms.observe(wall_ms)
+        self.db_ms.observe(metrics.db_ms)
+        self.template_ms.observe(metrics.template_ms)
+        self.queries.observe(metrics.queries)
+
+    def as_dict(self):
+        return {
+            name: histogram.as_dict()
+            for name, histogram in vars(self).items()
+        }
+
+
+_routes = {}
+_lock = threading.Lock()
+
+
+def record(route, metrics, wall_ms):
+    with _lock:
+        _routes.setdefault(route, RouteMetrics()).observe(metrics, wall_ms)
+
+
+def snapshot():
+    with _lock:
+        return {route: data.as_dict() for route, data in _routes.items()}
+
+
+def reset():
+    with _lock:
+        _routes.clear()
+
+
+@staff_member_required
+def metrics_view(request):
+    return JsonResponse(
+        {"routes": snapshot(), "status_cache": get_stats()},
+        json_dumps_params={"indent": 2},
+    )
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = current.get()
+        if metrics is None:
+            return super().render(context, request)
+
+        start = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_ms += (perf_counter() - start) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    The stock Django backend, with render time reported to the metrics
+    of the current request. Includes and extends are rendered inside
+    the outer template, so each page is timed once.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,226 @@
+import re
+import zlib
+from abc import ABC, abstractmethod
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils.cache import patch_vary_headers
+
+from . import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class AsyncCapableMiddleware(ABC):
+    """
+    Runs in the mode of the handler that wraps it, so that ASGI requests
+    reach the async views without a sync_to_async() hop. Subclasses
+    implement both __call__() and __acall__().
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    @abstractmethod
+    def __call__(self, request):
+        """Returns self.__acall__(request) in async mode."""
+
+    @abstractmethod
+    async def __acall__(self, request):
+        """The async version of __call__()."""
+
+
+def get_execute_wrappers():
+    return connection.execute_wrappers
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Records wall time, SQL queries and template time of every request
+    (see task_manager.metrics) and reports them in a Server-Timing header.
+    With METRICS_ENABLED off it removes itself from the chain at startup.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current.set(request_metrics)
+
+        try:
+            with connection.execute_wrapper(request_metrics):
+                response = self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+
+        return self.report(request, request_metrics, response)
+
+    async def __acall__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current.set(request_metrics)
+        # The queries run in the request's sync_to_async() thread, on
+        # that thread's connection.
+        wrappers = await sync_to_async(get_execute_wrappers)()
+        wrappers.append(request_metrics)
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            wrappers.remove(request_metrics)
+            metrics.current.reset(token)
+
+        return self.report(request, request_metrics, response)
+
+    @staticmethod
+    def report(request, request_metrics, response):
+        wall_ms = request_metrics.wall_ms
+        match = request.resolver_match
+        route = f"{request.method} /{match.route}" if match else "unmatched"
+        metrics.record(route, request_metrics, wall_ms)
+
+        response["Server-Timing"] = ", ".join(
+            [
+                f"app;dur={wall_ms:.1f}",
+                f'db;dur={request_metrics.db_ms:.1f};'
+                f'desc="{request_metrics.queries} queries"',
+                f"tpl;dur={request_metrics.template_ms:.1f}",
+            ]
+        )
+        return response
+
+
+ACCEPTS_BR = re.compile(r"\bbr\b")
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
+class GzipCompressor:
+    encoding = "gzip"
+
+    def __init__(self):
+        # wbits=31: gzip header and trailer.
+        self.compressor = zlib.compressobj(
+            settings.COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 31
+        )
+
+    def process(self, data):
+        return self.compressor.compress(data)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    encoding = "br"
+
+    def __init__(self):
+        self.compressor = brotli.Compressor(
+            mode=brotli.MODE_TEXT, quality=settings.COMPRESS_BROTLI_QUALITY
+        )
+
+    def process(self, data):
+        return self.compressor.process(data)
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+def compress_sequence(compressor, sequence):
+    """
+    Compresses a streamed body as it goes. Chunks are only yielded once
+    the compressor has output, not flushed per item: exports yield one
+    small row at a time, which would otherwise compress badly.
+    """
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(AsyncCapableMiddleware):
+    """
+    Brotli or gzip response compression, whichever the client accepts
+    (brotli first). Like django.middleware.gzip.GZipMiddleware, but with
+    a configurable size threshold and levels, and streamed responses are
+    compressed without flushing every chunk. Responses that already have
+    a Content-Encoding (e.g. static files from whitenoise) pass through.
+    """
+
+    def __init__(self, get_response):
+        if not settings.COMPRESS_RESPONSES:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        if not response.streaming and (
+            len(response.content) < settings.COMPRESS_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        compressor = self.get_compressor(request)
+        if compressor is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                compressor, response.streaming_content
+            )
+            del response.headers["Content-Length"]
+        else:
+            compressed = compressor.process(response.content)
+            compressed += compressor.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The bytes differ from the uncompressed representation.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = compressor.encoding
+
+        return response
+
+    @staticmethod
+    def get_compressor(request):
+        accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+
+        if brotli and ACCEPTS_BR.search(accept_encoding):
+            return BrotliCompressor()
+        if ACCEPTS_GZIP.search(accept_encoding):
+            return GzipCompressor()
+        return None
@@ -0,0 +1,153 @@
+import csv
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db.models import Q
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over (<key>, id).
+
+    Unlike OFFSET pagination every page costs the same index range scan,
+    no matter how deep the client has scrolled.
+    """
+
+    page_param = "after"
+
+    def __init__(self, queryset, key):
+        self.queryset = queryset.order_by(key, "id")
+        self.key = key
+
+    @staticmethod
+    def get_page_size(request):
+        try:
+            page_size = int(request.GET.get("page_size", settings.PAGE_SIZE))
+        except ValueError:
+            page_size = settings.PAGE_SIZE
+
+        return max(1, min(page_size, settings.MAX_PAGE_SIZE))
+
+    def encode_cursor(self, obj):
+        value = f"{getattr(obj, self.key).isoformat()}|{obj.id}"
+        return urlsafe_b64encode(value.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            value, pk = urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return datetime.fromisoformat(value), int(pk)
+        except ValueError:
+            return None
+
+    def get_queryset(self, request):
+        queryset = self.queryset
+        cursor = self.decode_cursor(request.GET.get("after", ""))
+
+        if cursor:
+            value, pk = cursor
+            queryset = queryset.filter(
+                Q(**{f"{self.key}__gt": value})
+                | Q(**{self.key: value, "id__gt": pk})
+            )
+
+        # One extra row tells whether there is a next page.
+        return queryset[: self.get_page_size(request) + 1]
+
+    def paginate(self, rows, request):
+        page_size = self.get_page_size(request)
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            return rows, self.encode_cursor(rows[-1])
+
+        return rows, None
+
+    def get_page(self, request):
+        """
+        Returns the rows of the requested page and the cursor
+        of the next one (None on the last page).
+        """
+        rows = list(self.get_queryset(request))
+        return self.paginate(rows, request)
+
+    async def aget_page(self, request):
+        rows = [row async for row in self.get_queryset(request).aiterator()]
+        return self.paginate(rows, request)
+
+
+class SearchPaginator:
+    """
+    Numbered pages of ranked search results, which have no key to
+    continue from. Each page is one query with one extra row to tell
+    whether there is a next page; nothing is counted.
+    """
+
+    page_param = "page"
+    get_page_size = staticmethod(KeysetPaginator.get_page_size)
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    @staticmethod
+    def get_page_number(request):
+        try:
+            return max(1, int(request.GET.get("page", 1)))
+        except ValueError:
+            return 1
+
+    def get_queryset(self, request):
+        page_size = self.get_page_size(request)
+        start = (self.get_page_number(request) - 1) * page_size
+        end = start + page_size + 1
+        return self.queryset[start:end]
+
+    def paginate(self, rows, request):
+        if len(rows) > self.get_page_size(request):
+            return rows[:-1], self.get_page_number(request) + 1
+
+        return rows, None
+
+    def get_page(self, request):
+        """
+        Returns the rows of the requested page and the number
+        of the next one (None on the last page).
+        """
+        rows = list(self.get_queryset(request))
+        return self.paginate(rows, request)
+
+    async def aget_page(self, request):
+        rows = [row async for row in self.get_queryset(request).aiterator()]
+        return self.paginate(rows, request)
+
+
+def get_next_query(request, paginator, next_page):
+    """
+    Query string of the page after the current one (None on the last
+    page), keeping the other parameters, like search and filters.
+    """
+    if next_page is None:
+        return None
+
+    params = request.GET.dict()
+    params[paginator.page_param] = next_page
+    params["page_size"] = paginator.get_page_size(request)
+    return urlencode(params)
+
+
+class Echo:
+    """
+    File-like object for csv.writer that hands rows back
+    instead of buffering them.
+    """
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
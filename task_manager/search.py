@@ -0,0 +1,92 @@
+"""
+Indexed search over short text columns (user names, status names).
+
+On PostgreSQL a search matches substrings with `icontains`, served by
+trigram GIN indexes on UPPER(<column>). Elsewhere it matches prefixes,
+written as a range on LOWER(<column>) so that an expression index on
+LOWER(<column>) serves it (LIKE can't use one on SQLite). SQLite's
+lower() only folds ASCII letters, so there the search is case-sensitive
+for other alphabets.
+
+Results are ranked: exact matches of the first field, then prefix
+matches, then the other substring matches; ties by the first field.
+
+Queries shorter than MIN_QUERY_LENGTH match a good part of every column
+and have no trigram to look up, so they only match the first field by
+prefix, read in the order of its LOWER() index: no ranking sort.
+"""
+import string
+import sys
+
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Lower
+
+MAX_QUERY_LENGTH = 100
+MIN_QUERY_LENGTH = 3
+ASCII_LOWERCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def get_query(request):
+    return request.GET.get("q", "").strip()[:MAX_QUERY_LENGTH]
+
+
+def fold_case(value, vendor):
+    """LOWER() as the database does it."""
+    if vendor == "sqlite":
+        return value.translate(ASCII_LOWERCASE)
+    return value.lower()
+
+
+def match_lower_prefix(field, query, vendor):
+    lowered = fold_case(query, vendor)
+    # startswith drops what a linguistic collation sorts into the range.
+    lookups = {
+        f"{field}_lower__gte": lowered,
+        f"{field}_lower__startswith": lowered,
+    }
+    last = ord(lowered[-1])
+    if last < sys.maxunicode:
+        # The smallest string greater than all those with the prefix.
+        upper = lowered[:-1] + chr(last + 1)
+        lookups[f"{field}_lower__lt"] = upper
+    return Q(**lookups)
+
+
+def match_prefix(field, query, vendor):
+    if vendor == "postgresql":
+        return Q(**{f"{field}__istartswith": query})
+
+    return match_lower_prefix(field, query, vendor)
+
+
+def search(queryset, fields, query):
+    """Rows of `queryset` with one of `fields` matching `query`, ranked."""
+    vendor = connections[queryset.db].vendor
+    queryset = queryset.alias(
+        **{f"{field}_lower": Lower(field) for field in fields}
+    )
+    first = f"{fields[0]}_lower"
+
+    if len(query) < MIN_QUERY_LENGTH:
+        # An exact match sorts first anyway.
+        return queryset.filter(
+            match_lower_prefix(fields[0], query, vendor)
+        ).order_by(first, "id")
+
+    prefix = Q()
+    substring = Q()
+
+    for field in fields:
+        prefix |= match_prefix(field, query, vendor)
+        substring |= Q(**{f"{field}__icontains": query})
+
+    rank = Case(
+        When(Q(**{first: fold_case(query, vendor)}), then=Value(0)),
+        When(prefix, then=Value(1)),
+        default=Value(2),
+        output_field=IntegerField(),
+    )
+    match = substring if vendor == "postgresql" else prefix
+
+    return queryset.filter(match).order_by(rank, first, "id")
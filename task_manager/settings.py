@@ -47,10 +47,15 @@ INSTALLED_APPS = [
     "task_manager",
     "task_manager.user",
     "task_manager.status",
+    "task_manager.task",
 ]
 
 MIDDLEWARE = [
+    "task_manager.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    # Above everything that produces or changes the body. Static files
+    # (whitenoise, inserted before it) come pre-compressed.
+    "task_manager.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -59,14 +64,38 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-route timings and query counts (task_manager.metrics),
+# served to staff at /metrics/ and in Server-Timing headers.
+METRICS_ENABLED = bool(int(getenv("METRICS_ENABLED", 0)))
+
+# Brotli/gzip compression of responses of at least COMPRESS_MIN_SIZE
+# bytes (task_manager.middleware.CompressionMiddleware). Brotli quality
+# above ~5 costs far more CPU than it saves bytes on dynamic pages.
+COMPRESS_RESPONSES = bool(int(getenv("COMPRESS_RESPONSES", 1)))
+COMPRESS_MIN_SIZE = int(getenv("COMPRESS_MIN_SIZE", 1024))
+COMPRESS_GZIP_LEVEL = int(getenv("COMPRESS_GZIP_LEVEL", 6))
+COMPRESS_BROTLI_QUALITY = int(getenv("COMPRESS_BROTLI_QUALITY", 4))
+
 ROOT_URLCONF = "task_manager.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "task_manager.metrics.TimedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
+            # Compiled templates are kept for the life of the process, in
+            # development too: runserver's autoreloader resets the cache
+            # when a template changes. The app's templates are compiled
+            # before the first request, see task_manager/warmup.py.
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -79,11 +108,160 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "task_manager.wsgi.application"
 
+# Compile the templates and load the URLconf when wsgi.py or asgi.py
+# loads the app, rather than on the first requests of each worker.
+WARMUP = bool(int(getenv("WARMUP", 1)))
+
+# Serve the list pages (main, users, statuses) with async views.
+# task_manager/asgi.py turns this on by default.
+ASYNC_VIEWS = bool(int(getenv("ASYNC_VIEWS", 0)))
+
 
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
-DATABASES = {"default": dj_database_url.config(default=getenv("DATABASE_URL"))}
+# Connections are kept open between requests for CONN_MAX_AGE seconds
+# and pinged before reuse when CONN_HEALTH_CHECKS is on.
+# DATABASE_POOL=1 switches PostgreSQL to an in-process pool instead:
+# connections go back to the pool after every request.
+
+DATABASE_POOL = bool(int(getenv("DATABASE_POOL", 0)))
+
+DATABASES = {
+    "default": dj_database_url.config(
+        default=getenv("DATABASE_URL"),
+        conn_max_age=int(getenv("CONN_MAX_AGE", 600)),
+        conn_health_checks=bool(int(getenv("CONN_HEALTH_CHECKS", 1))),
+    )
+}
+
+if DATABASE_POOL and "postgresql" in DATABASES["default"]["ENGINE"]:
+    DATABASES["default"].update(
+        {
+            "ENGINE": "task_manager.db.pooled_postgresql",
+            "CONN_MAX_AGE": 0,
+            "POOL": {
+                "MIN_SIZE": int(getenv("DATABASE_POOL_MIN_SIZE", 1)),
+                # One connection per gunicorn thread by default. Requests
+                # beyond MAX_SIZE wait up to TIMEOUT seconds for one.
+                "MAX_SIZE": int(
+                    getenv(
+                        "DATABASE_POOL_MAX_SIZE", getenv("GUNICORN_THREADS", 4)
+                    )
+                ),
+                "TIMEOUT": float(getenv("DATABASE_POOL_TIMEOUT", 10)),
+            },
+        }
+    )
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# LocMemCache is per process: with several workers point the status
+# catalogue at a shared backend (FileBasedCache, DatabaseCache, Redis)
+# or keep STATUS_CACHE_TIMEOUT short.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "status": {
+        "BACKEND": getenv(
+            "STATUS_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": getenv("STATUS_CACHE_LOCATION", "status-catalogue"),
+        "TIMEOUT": int(getenv("STATUS_CACHE_TIMEOUT", 60)),
+    },
+    "template_fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "template-fragments",
+    },
+    "sessions": {
+        "BACKEND": getenv(
+            "SESSION_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": getenv("SESSION_CACHE_LOCATION", "sessions"),
+    },
+}
+
+STATUS_CACHE_ALIAS = "status"
+
+# Whole-page cache for anonymous visitors of the main page and the user
+# list, in seconds. 0 disables it.
+PAGE_CACHE_TIMEOUT = int(getenv("PAGE_CACHE_TIMEOUT", 0))
+PAGE_CACHE_ALIAS = "default"
+
+
+# Sessions
+# https://docs.djangoproject.com/en/4.1/topics/http/sessions/
+# SESSION_MODE: db (one query per request), cached_db (reads from the
+# cache, writes through to the database), cache or signed_cookies
+# (no database at all). The cache-backed modes need a cache shared by all
+# workers (SESSION_CACHE_BACKEND), otherwise a logout in one worker
+# isn't seen by the others.
+
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+
+SESSION_ENGINE = SESSION_ENGINES[getenv("SESSION_MODE", "db")]
+
+SESSION_CACHE_ALIAS = "sessions"
+
+
+# Flash messages
+# https://docs.djangoproject.com/en/4.1/ref/contrib/messages/
+# MESSAGE_MODE: fallback (a signed cookie, the session only for what
+# doesn't fit in it), cookie or session. Messages kept in the session
+# cost a session write on the redirect and another one on the page that
+# shows them.
+
+MESSAGE_STORAGES = {
+    "fallback": "django.contrib.messages.storage.fallback.FallbackStorage",
+    "cookie": "django.contrib.messages.storage.cookie.CookieStorage",
+    "session": "django.contrib.messages.storage.session.SessionStorage",
+}
+
+MESSAGE_STORAGE = MESSAGE_STORAGES[getenv("MESSAGE_MODE", "fallback")]
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/4.1/topics/auth/passwords/
+# PASSWORD_HASHER_PROFILE picks the preferred hasher, the others stay
+# listed to verify (and upgrade on login) older hashes. argon2 and bcrypt
+# need the extras of the same name (poetry install -E argon2). "fast" is
+# for the test suite only. PASSWORD_HASHER_COST tunes the preferred
+# hasher: PBKDF2 iterations, scrypt work factor (a power of 2), argon2
+# time cost or bcrypt rounds (4 to 31); 0 keeps Django's default. A
+# system check (task_manager/checks.py) rejects a missing library or an
+# invalid cost.
+
+PASSWORD_HASHER_PROFILES = {
+    "pbkdf2": "task_manager.hashers.PBKDF2PasswordHasher",
+    "scrypt": "task_manager.hashers.ScryptPasswordHasher",
+    "argon2": "task_manager.hashers.Argon2PasswordHasher",
+    "bcrypt": "task_manager.hashers.BCryptSHA256PasswordHasher",
+}
+FAST_TEST_HASHER = "django.contrib.auth.hashers.MD5PasswordHasher"
+
+PASSWORD_HASHER_PROFILE = getenv("PASSWORD_HASHER_PROFILE", "pbkdf2")
+
+if PASSWORD_HASHER_PROFILE == "fast":
+    PASSWORD_HASHERS = [FAST_TEST_HASHER]
+else:
+    _preferred = PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]
+    PASSWORD_HASHERS = [_preferred] + [
+        hasher
+        for hasher in PASSWORD_HASHER_PROFILES.values()
+        if hasher != _preferred
+    ]
+
+PASSWORD_HASHER_COST = int(getenv("PASSWORD_HASHER_COST", 0))
 
 
 # Password validation
@@ -131,6 +309,31 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.1/howto/static-files/
 
 STATIC_URL = "static/"
+STATIC_ROOT = getenv("STATIC_ROOT", BASE_DIR / "staticfiles")
+
+# With STATIC_MANIFEST, collectstatic writes a copy of every file with
+# its content hash in the name, plus gzip and brotli variants, and
+# {% static %} resolves names through the manifest, so collectstatic must
+# have run first (`make release`; `make start` turns it on). Off, the
+# originals are served.
+STATIC_MANIFEST = bool(int(getenv("STATIC_MANIFEST", 0)))
+
+if STATIC_MANIFEST:
+    STATICFILES_STORAGE = (
+        "whitenoise.storage.CompressedManifestStaticFilesStorage"
+    )
+
+# Serve STATIC_ROOT from the application (whitenoise): hashed files are
+# sent with a far-future immutable Cache-Control and the gzip/brotli
+# variant matching Accept-Encoding. Turn off when a reverse proxy serves
+# STATIC_ROOT itself.
+SERVE_STATIC = bool(int(getenv("SERVE_STATIC", not DEBUG)))
+
+if SERVE_STATIC:
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+        "whitenoise.middleware.WhiteNoiseMiddleware",
+    )
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
@@ -138,3 +341,14 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 CSRF_TRUSTED_ORIGINS = [getenv("CSRF_TRUSTED_ORIGINS")]
+
+# Pagination of list views and chunking of streamed exports
+PAGE_SIZE = int(getenv("PAGE_SIZE", 50))
+MAX_PAGE_SIZE = int(getenv("MAX_PAGE_SIZE", 500))
+EXPORT_CHUNK_SIZE = int(getenv("EXPORT_CHUNK_SIZE", 2000))
+BULK_BATCH_SIZE = int(getenv("BULK_BATCH_SIZE", 1000))
+
+# Login throttling: failed attempts allowed per username and per IP
+# within LOGIN_THROTTLE_TIMEOUT seconds. 0 disables throttling.
+LOGIN_THROTTLE_ATTEMPTS = int(getenv("LOGIN_THROTTLE_ATTEMPTS", 0))
+LOGIN_THROTTLE_TIMEOUT = int(getenv("LOGIN_THROTTLE_TIMEOUT", 300))
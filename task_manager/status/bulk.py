@@ -0,0 +1,164 @@
+"""
+Bulk import and export of statuses, shared by the /statuses/bulk/
+endpoint and the import_statuses/export_statuses commands.
+
+Input is read line by line (CSV with a "name" header, or JSON lines),
+validated with StatusImportForm and written with bulk_create() in
+batches, all inside one transaction: either every row is imported or,
+if any row is invalid, none is.
+"""
+import csv
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.utils.translation import gettext as _
+
+from task_manager.pagination import stream_csv
+from task_manager.utils import batched
+from .cache import invalidate_on_commit
+from .forms import StatusImportForm
+from .models import Status
+
+
+FORMATS = ("csv", "jsonl")
+MAX_ERRORS = 100
+
+DUPLICATE_NAME = _("Duplicate name")
+ALREADY_EXISTS = _("Already exists")
+
+
+class BulkImportError(Exception):
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid rows")
+        self.errors = errors
+
+
+def read_rows(lines, fmt):
+    """Yields (line number, row) pairs, the CSV header being line 1."""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line, text in enumerate(lines, start=1):
+        if text.strip():
+            try:
+                yield line, json.loads(text)
+            except ValueError:
+                yield line, None
+
+
+def name_error(message):
+    return {"name": [{"message": message, "code": "unique"}]}
+
+
+def validate_batch(batch, seen, errors):
+    statuses = []
+
+    for line, row in batch:
+        form = StatusImportForm(data=row if isinstance(row, dict) else {})
+        if not form.is_valid():
+            errors.append(
+                {"line": line, "errors": form.errors.get_json_data()}
+            )
+            continue
+
+        key = form.instance.name.lower()
+        if key in seen:
+            errors.append(
+                {"line": line, "errors": name_error(DUPLICATE_NAME)}
+            )
+            continue
+
+        seen.add(key)
+        statuses.append((line, form.instance))
+
+    names = [status.name.lower() for line, status in statuses]
+    existing = set(
+        Status.objects.annotate(lower_name=Lower("name"))
+        .filter(lower_name__in=names)
+        .values_list("lower_name", flat=True)
+    )
+    for line, status in statuses:
+        if status.name.lower() in existing:
+            errors.append({"line": line, "errors": name_error(ALREADY_EXISTS)})
+
+    return statuses
+
+
+def find_conflicts(statuses, errors):
+    """
+    Inserts the rows of a batch one by one, each in a savepoint, to
+    report those the database rejects.
+    """
+    for line, status in statuses:
+        try:
+            with transaction.atomic():
+                status.save()
+        except IntegrityError:
+            errors.append({"line": line, "errors": name_error(ALREADY_EXISTS)})
+
+
+def import_statuses(rows, batch_size=None):
+    """
+    Imports the (line number, row) pairs of read_rows(). Returns the
+    number of created statuses or raises BulkImportError with (at most
+    MAX_ERRORS) line numbers and form errors.
+    """
+    batch_size = batch_size or settings.BULK_BATCH_SIZE
+    seen = set()
+    errors = []
+    created = 0
+
+    with transaction.atomic():
+        for batch in batched(rows, batch_size):
+            statuses = validate_batch(batch, seen, errors)
+            if errors:
+                # Keep validating to report more errors,
+                # there is no point in writing anything.
+                if len(errors) >= MAX_ERRORS:
+                    break
+                continue
+
+            try:
+                with transaction.atomic():
+                    Status.objects.bulk_create(
+                        [status for line, status in statuses],
+                        batch_size=batch_size,
+                    )
+            except IntegrityError:
+                # The database lowercases differently than Python
+                # (e.g. SQLite only folds ASCII).
+                find_conflicts(statuses, errors)
+                continue
+            created += len(statuses)
+
+        if errors:
+            raise BulkImportError(errors[:MAX_ERRORS])
+
+        # bulk_create() doesn't send post_save.
+        invalidate_on_commit()
+
+    return created
+
+
+def export_statuses(fmt):
+    """
+    Yields the whole catalogue as CSV or JSON lines,
+    reading it from the database in EXPORT_CHUNK_SIZE chunks.
+    """
+    rows = Status.objects.values_list("id", "name", "created_at").iterator(
+        chunk_size=settings.EXPORT_CHUNK_SIZE
+    )
+
+    if fmt == "csv":
+        yield from stream_csv(("id", "name", "created_at"), rows)
+        return
+
+    for pk, name, created_at in rows:
+        yield json.dumps(
+            {"id": pk, "name": name, "created_at": created_at.isoformat()}
+        ) + "\n"
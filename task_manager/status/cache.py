@@ -0,0 +1,133 @@
+"""
+Cached status catalogue.
+
+Statuses change rarely, so the whole list is kept in the cache configured
+by STATUS_CACHE_ALIAS under a versioned key. Saving or deleting a status
+bumps the version (see signals.py; queryset updates and deletes have
+to call invalidate_on_commit() themselves), which makes every process re-read
+the list on its next access.
+
+The ETag and Last-Modified of the status pages are derived from the
+cached rows, so with a per-process cache they are only as stale as the
+rows are (STATUS_CACHE_TIMEOUT), like the pages themselves.
+"""
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from task_manager.conditional import make_etag
+
+from .models import Status
+
+
+VERSION_KEY = "status-catalogue:version"
+DATA_KEY = "status-catalogue:{}"
+
+stats = Counter(hits=0, misses=0)
+
+
+def get_cache():
+    return caches[settings.STATUS_CACHE_ALIAS]
+
+
+def get_version():
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+
+    return version
+
+
+def invalidate():
+    cache = get_cache()
+
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # The version was evicted: restart from a value
+        # that can't collide with any previously cached list.
+        cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_on_commit():
+    """Invalidates now and again once the current transaction commits."""
+    invalidate()
+    # Bump once more after commit: a concurrent request could have cached
+    # the old rows between the write and the end of the transaction.
+    transaction.on_commit(invalidate)
+
+
+def get_catalogue():
+    """The statuses and when this cache read them from the database."""
+    cache = get_cache()
+    key = DATA_KEY.format(get_version())
+    catalogue = cache.get(key)
+
+    if catalogue is None:
+        stats["misses"] += 1
+        catalogue = (timezone.now(), list(Status.objects.all()))
+        cache.set(key, catalogue)
+    else:
+        stats["hits"] += 1
+
+    return catalogue
+
+
+def get_statuses():
+    return get_catalogue()[1]
+
+
+async def aget_statuses():
+    cache = get_cache()
+    version = await cache.aget(VERSION_KEY)
+
+    if version is None:
+        await cache.aadd(VERSION_KEY, time.time_ns(), timeout=None)
+        version = await cache.aget(VERSION_KEY)
+
+    key = DATA_KEY.format(version)
+    catalogue = await cache.aget(key)
+
+    if catalogue is None:
+        stats["misses"] += 1
+        statuses = [status async for status in Status.objects.aiterator()]
+        catalogue = (timezone.now(), statuses)
+        await cache.aset(key, catalogue)
+    else:
+        stats["hits"] += 1
+
+    return catalogue[1]
+
+
+def get_last_modified():
+    """
+    When the cached rows were read. No earlier than the last change they
+    show, whichever process made it, and it moves forward whenever they
+    are re-read.
+    """
+    return get_catalogue()[0]
+
+
+def get_etag():
+    """
+    Computed from the cached rows themselves, so every process holding
+    the same rows gives the same ETag and one holding stale rows can't
+    match a client that has seen the new ones.
+    """
+    return make_etag(
+        [
+            (status.id, status.name, status.created_at)
+            for status in get_statuses()
+        ]
+    )
+
+
+def get_stats():
+    return {"hits": stats["hits"], "misses": stats["misses"]}
@@ -1,4 +1,7 @@
-from django.forms import ModelForm
+from django.core.exceptions import ValidationError
+from django.forms import ModelForm, ModelChoiceField
+from django.forms.models import ModelChoiceIterator, construct_instance
+from .cache import get_statuses
 from .models import Status
 
 
@@ -6,3 +9,63 @@ class StatusForm(ModelForm):
     class Meta:
         model = Status
         fields = ["name"]
+
+
+class StatusUpdateForm(StatusForm):
+    """
+    StatusForm for the existing status `pk`, validated without loading
+    it: the name constraint check only needs the pk to leave it out.
+    """
+
+    def __init__(self, data, pk):
+        instance = Status(id=pk)
+        instance._state.adding = False
+        super().__init__(data, instance=instance)
+
+
+class StatusImportForm(StatusForm):
+    """
+    StatusForm without the per-row uniqueness query:
+    the bulk importer checks names against the database once per batch.
+    """
+
+    def _post_clean(self):
+        self.instance = construct_instance(
+            self, self.instance, self._meta.fields
+        )
+        try:
+            self.instance.full_clean(
+                exclude=self._get_validation_exclusions(),
+                validate_unique=False,
+                validate_constraints=False,
+            )
+        except ValidationError as e:
+            self._update_errors(e)
+
+
+class CachedStatusIterator(ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in get_statuses():
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(get_statuses()) + (
+            1 if self.field.empty_label is not None else 0
+        )
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(get_statuses())
+
+
+class StatusChoiceField(ModelChoiceField):
+    """
+    Status select for other forms, rendered from the cached catalogue.
+    Only validation of the submitted value touches the database.
+    """
+
+    iterator = CachedStatusIterator
+
+    def __init__(self, **kwargs):
+        super().__init__(queryset=Status.objects.all(), **kwargs)
@@ -0,0 +1,95 @@
+import json
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models.functions import Lower
+
+from task_manager.status.models import Status
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed statuses and compare query plans and latency of the status "
+        "list and the duplicate check with and without the indexes. "
+        "Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        self.repeat = options["repeat"]
+        self.probe = f"status-{options['rows'] // 2}"
+        report = {"rows": options["rows"], "vendor": connection.vendor}
+
+        try:
+            with transaction.atomic():
+                Status.objects.bulk_create(
+                    (
+                        Status(name=f"status-{i}")
+                        for i in range(options["rows"])
+                    ),
+                    batch_size=5000,
+                )
+                report["after"] = self.measure("after")
+
+                # Both are plain (unique) indexes on every backend,
+                # and DROP INDEX is transactional on SQLite and PostgreSQL.
+                with connection.cursor() as cursor:
+                    for index in Status._meta.indexes + list(
+                        Status._meta.constraints
+                    ):
+                        name = connection.ops.quote_name(index.name)
+                        cursor.execute(f"DROP INDEX {name}")
+                report["before"] = self.measure("before")
+
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def measure(self, stage):
+        queries = {
+            "list": Status.objects.all()[: settings.PAGE_SIZE],
+            "duplicate": Status.objects.alias(lower_name=Lower("name"))
+            .filter(lower_name=self.probe)
+            .order_by()
+            .values("id"),
+        }
+        return {
+            name: {
+                "plan": self.explain(queryset, stage),
+                "ms": self.timeit(queryset),
+            }
+            for name, queryset in queries.items()
+        }
+
+    @staticmethod
+    def explain(queryset, stage):
+        """
+        QuerySet.explain() would hit SQLite's statement cache and report
+        the plan prepared before the indexes were dropped; the trailing
+        comment makes every run a distinct statement.
+        """
+        sql, params = queryset.query.sql_with_params()
+        prefix = connection.ops.explain_query_prefix()
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql} /* {stage} */", params)
+            return "\n".join(
+                " ".join(str(column) for column in row)
+                for row in cursor.fetchall()
+            )
+
+    def timeit(self, queryset):
+        start = perf_counter()
+        for _ in range(self.repeat):
+            list(queryset.all())
+        return round((perf_counter() - start) * 1000 / self.repeat, 3)
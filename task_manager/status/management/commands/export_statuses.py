@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from task_manager.status import bulk
+
+
+class Command(BaseCommand):
+    help = "Stream every status to stdout as CSV or JSON lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=bulk.FORMATS, default="csv")
+
+    def handle(self, *args, **options):
+        for chunk in bulk.export_statuses(options["format"]):
+            self.stdout.write(chunk, ending="")
@@ -0,0 +1,52 @@
+import json
+import sys
+from contextlib import nullcontext
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.status import bulk
+
+
+class Command(BaseCommand):
+    help = (
+        "Import statuses from a CSV file (with a 'name' column) or "
+        "from JSON lines. Nothing is written if any row is invalid."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read, '-' for stdin.")
+        parser.add_argument("--format", choices=bulk.FORMATS)
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.BULK_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"]
+        if fmt is None:
+            fmt = "csv" if path.endswith(".csv") else "jsonl"
+        if path == "-":
+            source = nullcontext(sys.stdin)
+        else:
+            source = open(path, encoding="utf-8")
+
+        start = perf_counter()
+        try:
+            with source as lines:
+                created = bulk.import_statuses(
+                    bulk.read_rows(lines, fmt), options["batch_size"]
+                )
+        except bulk.BulkImportError as e:
+            for error in e.errors:
+                self.stderr.write(json.dumps(error))
+            raise CommandError(str(e))
+        except UnicodeDecodeError as e:
+            raise CommandError(f"{path} is not valid UTF-8: {e}")
+
+        elapsed = perf_counter() - start
+        self.stdout.write(
+            f"Imported {created} statuses in {elapsed:.2f}s "
+            f"({created / elapsed:.0f} rows/s)"
+        )
@@ -0,0 +1,33 @@
+# Generated by Django 4.1.7 on 2026-10-18 17:54
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("status", "0002_rename_value_status_name_status_created_at"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="status",
+            options={"ordering": ["created_at", "id"]},
+        ),
+        migrations.AddIndex(
+            model_name="status",
+            index=models.Index(
+                fields=["created_at", "id"], name="status_created_at_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="status",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("name"),
+                name="status_name_ci_unique",
+                violation_error_message=(
+                    "A status with this name already exists."
+                ),
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+# The unique constraint on LOWER(name) serves prefix searches, so only
+# PostgreSQL needs an index: a trigram one for icontains.
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        'CREATE INDEX "status_status_name_trgm_idx" ON "status_status" '
+        'USING gin ((UPPER("name"::text)) gin_trgm_ops)'
+    )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute('DROP INDEX "status_status_name_trgm_idx"')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("status", "0003_status_ordering_and_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -1,6 +1,28 @@
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils.translation import gettext_lazy as _
 
 
 class Status(models.Model):
     name = models.CharField(max_length=500)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], name="status_created_at_idx"
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                Lower("name"),
+                name="status_name_ci_unique",
+                violation_error_message=_(
+                    "A status with this name already exists."
+                ),
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
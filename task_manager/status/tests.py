@@ -1,8 +1,29 @@
-from django.test import TestCase
+import json
+import tempfile
+from io import StringIO
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, AsyncRequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
+from django.forms import Form
 from .models import Status
+from .cache import (
+    get_cache,
+    get_etag,
+    get_last_modified,
+    get_stats,
+    get_statuses,
+    invalidate,
+)
+from .forms import StatusChoiceField
+from . import bulk
+from .views import AsyncStatusesView, INVALID_ENCODING, STATUS_CREATE_SUCCESS
 from django.urls import reverse
 from urllib.parse import urlencode
+from task_manager.task.models import Task
+from task_manager.testing import QueryBudgetMixin
 
 
 class TestStatusesView(TestCase):
@@ -32,6 +53,166 @@ class TestStatusesView(TestCase):
         self.assertTemplateUsed(resp, "status/statuses.html")
         self.assertListEqual(list(resp.context["statuses"]), self.statuses)
 
+    @override_settings(PAGE_SIZE=1)
+    def test_view_search(self):
+        Status.objects.create(name="Reopened")
+        self.client.login(username="wiku", password="Pukote74.")
+
+        resp = self.client.get(reverse("statuses"), {"q": "re"})
+        self.assertListEqual(
+            [status.name for status in resp.context["statuses"]],
+            ["Ready!!!"],
+        )
+
+        resp = self.client.get(
+            f"{reverse('statuses')}?{resp.context['next_query']}"
+        )
+        self.assertListEqual(
+            [status.name for status in resp.context["statuses"]],
+            ["Reopened"],
+        )
+        self.assertIsNone(resp.context["next_query"])
+
+
+class TestAsyncStatusesView(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="wiku")
+        self.statuses = [
+            Status.objects.create(name="Ready!!!"),
+            Status.objects.create(name="In progress"),
+        ]
+        return super().setUp()
+
+    async def test_view_get_all_statuses(self):
+        request = AsyncRequestFactory().get(reverse("statuses"))
+        request.user = self.user
+
+        resp = await AsyncStatusesView.as_view()(request)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Ready!!!")
+        self.assertContains(resp, "In progress")
+
+    async def test_view_search(self):
+        request = AsyncRequestFactory().get(reverse("statuses"), {"q": "in"})
+        request.user = self.user
+
+        resp = await AsyncStatusesView.as_view()(request)
+
+        self.assertContains(resp, "In progress")
+        self.assertNotContains(resp, "Ready!!!")
+
+
+class TestStatusCatalogue(TestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        self.statuses = [
+            Status.objects.create(name="Ready!!!"),
+            Status.objects.create(name="In progress"),
+        ]
+        return super().setUp()
+
+    def test_second_read_is_cached(self):
+        with self.assertNumQueries(1):
+            self.assertListEqual(get_statuses(), self.statuses)
+
+        hits = get_stats()["hits"]
+        with self.assertNumQueries(0):
+            self.assertListEqual(get_statuses(), self.statuses)
+        self.assertEqual(get_stats()["hits"], hits + 1)
+
+    def test_save_and_delete_invalidate(self):
+        get_statuses()
+
+        self.statuses[0].name = "Done"
+        self.statuses[0].save()
+        self.assertEqual(get_statuses()[0].name, "Done")
+
+        self.statuses[1].delete()
+        self.assertListEqual(get_statuses(), self.statuses[:1])
+
+    def test_validators_follow_the_cached_rows(self):
+        etag, last_modified = get_etag(), get_last_modified()
+
+        # Another process with the same rows agrees on the ETag.
+        get_cache().clear()
+        self.assertEqual(get_etag(), etag)
+
+        # A rename elsewhere shows once the rows here are re-read.
+        Status.objects.filter(id=self.statuses[0].id).update(name="Done")
+        self.assertEqual(get_etag(), etag)
+        get_cache().clear()
+        self.assertNotEqual(get_etag(), etag)
+        self.assertGreater(get_last_modified(), last_modified)
+
+    def test_file_based_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            caches = {
+                "default": {
+                    "BACKEND": "django.core.cache.backends."
+                    "locmem.LocMemCache",
+                },
+                "status": {
+                    "BACKEND": "django.core.cache.backends."
+                    "filebased.FileBasedCache",
+                    "LOCATION": location,
+                },
+            }
+            with override_settings(CACHES=caches):
+                get_statuses()
+                with self.assertNumQueries(0):
+                    self.assertListEqual(get_statuses(), self.statuses)
+
+                Status.objects.create(name="Error")
+                self.assertEqual(len(get_statuses()), 3)
+
+    def test_choice_field_renders_from_cache(self):
+        class TaskForm(Form):
+            status = StatusChoiceField()
+
+        get_statuses()
+        with self.assertNumQueries(0):
+            html = str(TaskForm()["status"])
+        self.assertIn("In progress", html)
+
+
+class TestStatusesApi(QueryBudgetMixin, TestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        self.user = User.objects.create(username="wiku")
+        self.status = Status.objects.create(name="Ready!!!")
+        return super().setUp()
+
+    def test_anonymous(self):
+        resp = self.client.get(reverse("api_statuses"))
+
+        self.assertEqual(resp.status_code, 401)
+
+    def test_conditional_get(self):
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse("api_statuses"))
+        etag = resp["ETag"]
+
+        self.assertEqual(resp.json()["results"][0]["name"], "Ready!!!")
+        self.assertIn("no-cache", resp["Cache-Control"])
+
+        # Session and user only, the catalogue comes from the cache.
+        with self.assertMaxQueries(2):
+            resp = self.client.get(
+                reverse("api_statuses"), HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp["ETag"], etag)
+
+        self.status.name = "Done"
+        self.status.save()
+        resp = self.client.get(
+            reverse("api_statuses"), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+        self.assertEqual(resp.json()["results"][0]["name"], "Done")
+
 
 class TestStatusCreate(TestCase):
     def setUp(self) -> None:
@@ -71,6 +252,16 @@ class TestStatusCreate(TestCase):
         self.assertRedirects(resp, reverse("statuses"))
         self.assertEqual(message.tags, "success")
 
+        resp = self.client.post(
+            reverse("create_status"),
+            urlencode({"name": "FOGOTTEN"}),
+            content_type="application/x-www-form-urlencoded",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertTemplateUsed(resp, "status/create.html")
+        self.assertTrue(resp.context["form"].errors)
+        self.assertEqual(Status.objects.count(), 1)
+
         self.client.logout()
         resp = self.client.post(
             reverse("create_status"),
@@ -143,6 +334,30 @@ class TestStatusUpdate(TestCase):
         self.assertRedirects(resp, reverse("login"))
         self.assertEqual(message.tags, "error")
 
+    def test_view_post_validates_against_other_statuses(self):
+        self.client.login(username="wiku", password="Pukote74.")
+        get_statuses()
+
+        resp = self.client.post(
+            reverse("update_status", kwargs={"pk": 1}), {"name": "READY!!!"}
+        )
+        self.assertRedirects(resp, reverse("statuses"))
+        self.assertEqual(get_statuses()[0].name, "READY!!!")
+
+        resp = self.client.post(
+            reverse("update_status", kwargs={"pk": 1}), {"name": "error"}
+        )
+        self.assertTemplateUsed(resp, "status/update.html")
+        self.assertContains(resp, "Update status READY!!!")
+
+    def test_view_post_missing_status(self):
+        self.client.login(username="wiku", password="Pukote74.")
+        resp = self.client.post(
+            reverse("update_status", kwargs={"pk": 100}), {"name": "Done"}
+        )
+
+        self.assertEqual(resp.status_code, 404)
+
 
 class TestStatusDelete(TestCase):
     def setUp(self) -> None:
@@ -179,12 +394,6 @@ class TestStatusDelete(TestCase):
         self.assertEqual(message.tags, "error")
 
     def test_view_post(self):
-        """
-
-        ДОБАВИТЬ ПРОВЕРКУ ИСПОЛЬЗОВАНИЯ В ЗАДАЧАХ!!!
-
-        """
-
         self.client.login(username="wiku", password="Pukote74.")
         resp = self.client.post(
             reverse("delete_status", kwargs={"pk": 1}),
@@ -206,3 +415,270 @@ class TestStatusDelete(TestCase):
 
         self.assertRedirects(resp, reverse("login"))
         self.assertEqual(message.tags, "error")
+
+    def test_view_post_status_in_use(self):
+        Task.objects.create(
+            name="Task",
+            status=self.statuses[1],
+            author=User.objects.get(username="wiku"),
+        )
+        self.client.login(username="wiku", password="Pukote74.")
+        resp = self.client.post(
+            reverse("delete_status", kwargs={"pk": self.statuses[1].id}),
+            follow=True,
+        )
+        message = list(resp.context.get("messages"))[0]
+
+        self.assertRedirects(resp, reverse("statuses"))
+        self.assertEqual(message.tags, "error")
+        self.assertTrue(Status.objects.filter(id=self.statuses[1].id))
+
+    def test_view_post_refreshes_catalogue(self):
+        self.client.login(username="wiku", password="Pukote74.")
+        get_statuses()
+
+        self.client.post(reverse("delete_status", kwargs={"pk": 1}))
+        self.assertEqual(len(get_statuses()), 2)
+
+        resp = self.client.post(reverse("delete_status", kwargs={"pk": 1}))
+        self.assertEqual(resp.status_code, 404)
+
+
+class TestStatusQueries(QueryBudgetMixin, TestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        self.user = User.objects.create(username="wiku")
+        self.status = Status.objects.create(name="Ready!!!")
+        self.client.force_login(self.user)
+        return super().setUp()
+
+    @staticmethod
+    def seed(count):
+        offset = Status.objects.count()
+        Status.objects.bulk_create(
+            Status(name=f"status-{offset + i}") for i in range(count)
+        )
+        # bulk_create() doesn't send post_save.
+        invalidate()
+
+    def test_statuses(self):
+        with self.assertMaxQueries(3):
+            self.client.get(reverse("statuses"))
+
+        self.assertQueriesDoNotGrow(
+            self.seed, lambda: self.client.get(reverse("statuses"))
+        )
+
+    @override_settings(
+        SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies"
+    )
+    def test_revalidation(self):
+        self.client.force_login(self.user)
+        # The first render sets the CSRF cookie of the logout form.
+        self.client.get(reverse("statuses"))
+        resp = self.client.get(reverse("statuses"))
+        etag, last_modified = resp["ETag"], resp["Last-Modified"]
+
+        self.assertIn("private", resp["Cache-Control"])
+
+        # Only the user lookup, the catalogue stamps come from the cache.
+        with self.assertMaxQueries(1):
+            resp = self.client.get(
+                reverse("statuses"), HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(resp.status_code, 304)
+
+        resp = self.client.get(
+            reverse("statuses"), HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(resp.status_code, 304)
+
+        self.client.post(
+            reverse("update_status", kwargs={"pk": self.status.id}),
+            {"name": "Done"},
+        )
+        # The success message is pending: always rendered.
+        resp = self.client.get(reverse("statuses"), HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(resp, "Done")
+        self.assertNotIn("ETag", resp)
+
+        resp = self.client.get(reverse("statuses"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_pending_message_ignores_if_modified_since(self):
+        resp = self.client.get(reverse("statuses"))
+        last_modified = resp["Last-Modified"]
+
+        self.client.post(reverse("create_status"), {"name": "Done"})
+        resp = self.client.get(
+            reverse("statuses"), HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertContains(resp, STATUS_CREATE_SUCCESS)
+        self.assertNotIn("Last-Modified", resp)
+
+    def test_create(self):
+        with self.assertMaxQueries(2):
+            self.client.get(reverse("create_status"))
+
+        with self.assertMaxQueries(4):
+            self.client.post(reverse("create_status"), {"name": "Done"})
+
+    def count_session_writes(self):
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.post(
+                reverse("create_status"),
+                {"name": f"status-{Status.objects.count()}"},
+                follow=True,
+            )
+        self.assertContains(resp, STATUS_CREATE_SUCCESS)
+
+        return sum(
+            query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+            and "django_session" in query["sql"]
+            for query in context.captured_queries
+        )
+
+    def test_create_does_not_write_the_session(self):
+        # The message travels in a cookie.
+        self.assertEqual(self.count_session_writes(), 0)
+
+        with override_settings(
+            MESSAGE_STORAGE=settings.MESSAGE_STORAGES["session"]
+        ):
+            self.assertEqual(self.count_session_writes(), 2)
+
+    def test_update(self):
+        url = reverse("update_status", kwargs={"pk": self.status.id})
+
+        with self.assertMaxQueries(3):
+            self.client.get(url)
+
+        # Constraint check and UPDATE, the status isn't loaded.
+        with self.assertMaxQueries(4):
+            self.client.post(url, {"name": "Done"})
+
+    def test_delete(self):
+        url = reverse("delete_status", kwargs={"pk": self.status.id})
+
+        with self.assertMaxQueries(3):
+            self.client.get(url)
+
+        # A single DELETE ... WHERE NOT EXISTS (<tasks>).
+        with self.assertMaxQueries(3):
+            self.client.post(url)
+
+    def test_anonymous_requests_cost_no_queries(self):
+        self.client.logout()
+        pk = self.status.id
+
+        with self.assertMaxQueries(0):
+            self.client.get(reverse("statuses"))
+            self.client.post(reverse("create_status"), {"name": "Done"})
+            self.client.post(reverse("update_status", kwargs={"pk": pk}))
+            self.client.post(reverse("delete_status", kwargs={"pk": pk}))
+
+
+class TestStatusBulk(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="wiku")
+        self.client.force_login(self.user)
+        Status.objects.create(name="Ready!!!")
+        return super().setUp()
+
+    def test_import_csv(self):
+        resp = self.client.post(
+            reverse("bulk_statuses"),
+            "name\nIn progress\nError\n",
+            content_type="text/csv",
+        )
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.json(), {"created": 2})
+        self.assertEqual(len(get_statuses()), 3)
+
+    def test_import_jsonl_is_all_or_nothing(self):
+        body = "\n".join(
+            [
+                '{"name": "In progress"}',
+                '{"name": "in PROGRESS"}',
+                '{"name": "ready!!!"}',
+                '{"name": ""}',
+                "not json",
+                '{"name": "Error"}',
+            ]
+        )
+        resp = self.client.post(
+            reverse("bulk_statuses"), body, content_type="application/jsonl"
+        )
+
+        self.assertEqual(resp.status_code, 400)
+        lines = [error["line"] for error in resp.json()["errors"]]
+        self.assertListEqual(sorted(lines), [2, 3, 4, 5])
+        self.assertEqual(Status.objects.count(), 1)
+
+    def import_csv(self, body):
+        resp = self.client.post(
+            reverse("bulk_statuses"), body, content_type="text/csv"
+        )
+        return {e["line"]: e["errors"] for e in resp.json()["errors"]}
+
+    def test_import_reports_file_lines(self):
+        # The header is line 1 and blank lines count.
+        errors = self.import_csv("name\nIn progress\n\nin progress\n")
+
+        self.assertListEqual(list(errors), [4])
+        self.assertEqual(
+            errors[4]["name"][0]["message"], bulk.DUPLICATE_NAME
+        )
+
+    def test_import_reports_rows_the_database_rejects(self):
+        # SQLite only folds ASCII: the lookup of existing names misses
+        # "Ärger", the unique index on LOWER(name) doesn't.
+        Status.objects.create(name="Ärger")
+        errors = self.import_csv("name\nNew\nÄrger\nOld\n")
+
+        self.assertListEqual(list(errors), [3])
+        self.assertEqual(
+            errors[3]["name"][0]["message"], bulk.ALREADY_EXISTS
+        )
+        self.assertEqual(Status.objects.count(), 2)
+
+    def test_import_rejects_invalid_utf8(self):
+        resp = self.client.post(
+            reverse("bulk_statuses"),
+            b"name\n\xff\n",
+            content_type="text/csv",
+        )
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json(), {"error": INVALID_ENCODING})
+
+    def test_export(self):
+        resp = self.client.get(reverse("bulk_statuses"))
+        rows = b"".join(resp.streaming_content).decode().splitlines()
+        self.assertEqual(rows[0], "id,name,created_at")
+        self.assertIn("Ready!!!", rows[1])
+
+        resp = self.client.get(reverse("bulk_statuses"), {"format": "jsonl"})
+        rows = b"".join(resp.streaming_content).decode().splitlines()
+        self.assertEqual(json.loads(rows[0])["name"], "Ready!!!")
+
+        self.client.logout()
+        resp = self.client.get(reverse("bulk_statuses"))
+        self.assertRedirects(resp, reverse("login"))
+
+    def test_commands(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as source:
+            source.write("name\nIn progress\nError\n")
+            source.flush()
+            call_command(
+                "import_statuses", source.name, batch_size=1, stdout=StringIO()
+            )
+
+        out = StringIO()
+        call_command("export_statuses", format="jsonl", stdout=out)
+        rows = out.getvalue().splitlines()
+        names = [json.loads(row)["name"] for row in rows]
+        self.assertListEqual(names, ["Ready!!!", "In progress", "Error"])
@@ -1,14 +1,22 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
+    AsyncStatusesView,
     StatusesView,
+    StatusesApiView,
     StatusCreateView,
     StatusUpdateView,
     StatusDeleteView,
+    StatusBulkView,
 )
 
+StatusesView = AsyncStatusesView if settings.ASYNC_VIEWS else StatusesView
+
 urlpatterns = [
     path("", StatusesView.as_view(), name="statuses"),
+    path("api/", StatusesApiView.as_view(), name="api_statuses"),
     path("create/", StatusCreateView.as_view(), name="create_status"),
+    path("bulk/", StatusBulkView.as_view(), name="bulk_statuses"),
     path("<int:pk>/update/", StatusUpdateView.as_view(), name="update_status"),
     path("<int:pk>/delete/", StatusDeleteView.as_view(), name="delete_status"),
 ]
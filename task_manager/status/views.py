@@ -1,106 +1,261 @@
+import codecs
+from django.db import IntegrityError, connection
 from django.views import View
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from .models import Status
-from .forms import StatusForm
+from .forms import StatusForm, StatusUpdateForm
+from . import bulk
+from asgiref.sync import sync_to_async
+from .cache import get_statuses, aget_statuses, get_etag, get_last_modified
+from .cache import invalidate_on_commit
+from task_manager.api import conditional_json
+from task_manager.task.models import Task
+from task_manager.conditional import page_etag, not_modified, set_validators
+from task_manager.mixins import AUTHENTICATION_ERROR, AuthRequiredMixin
+from task_manager.pagination import SearchPaginator, get_next_query
+from task_manager.search import get_query, search
+from task_manager.utils import arender
 from django.utils.translation import gettext as _
 
 
-AUTHENTICATION_ERROR = _("You are not authorized! Please sign in.")
 STATUS_CREATE_SUCCESS = _("Status created successfully")
 STATUS_UPDATE_SUCCESS = _("Status updated successfully")
 STATUS_DELETE_SUCCESS = _("Status deleted successfully")
+STATUS_DELETE_ERROR = _("Cannot delete status because it is in use")
+UNKNOWN_FORMAT = _("Unknown format")
+INVALID_ENCODING = _("The request body is not valid UTF-8")
 
 
-class StatusesView(View):
+def get_validators(request):
+    etag = page_etag(request, get_etag())
+    if etag is None:
+        # Flash messages are pending: no validator may match.
+        return None, None
+
+    return etag, get_last_modified()
+
+
+def get_search_paginator(query):
+    return SearchPaginator(search(Status.objects.all(), ("name",), query))
+
+
+class StatusesView(AuthRequiredMixin, View):
+    """
+    The whole catalogue from the cache, or with ?q= the matching
+    statuses from the database, a page at a time. Both change only
+    with the catalogue, so they share its validators.
+    """
+
     def get(self, request):
-        if request.user.is_authenticated:
-            statuses = Status.objects.all()
-            return render(
-                request, "status/statuses.html", {"statuses": statuses}
-            )
+        etag, last_modified = get_validators(request)
+        response = not_modified(request, etag, last_modified)
 
-        messages.add_message(request, messages.ERROR, AUTHENTICATION_ERROR)
-        return redirect("login")
+        if response is None:
+            query = get_query(request)
+            context = {"query": query}
+            if query:
+                paginator = get_search_paginator(query)
+                statuses, next_page = paginator.get_page(request)
+                context["next_query"] = get_next_query(
+                    request, paginator, next_page
+                )
+            else:
+                statuses = get_statuses()
+            context["statuses"] = statuses
+            response = render(request, "status/statuses.html", context)
+
+        return set_validators(response, etag, last_modified, private=True)
+
+
+class AsyncStatusesView(AuthRequiredMixin, View):
+    async def get(self, request):
+        etag, last_modified = await sync_to_async(get_validators)(request)
+        response = not_modified(request, etag, last_modified)
+
+        if response is None:
+            query = get_query(request)
+            context = {"query": query}
+            if query:
+                paginator = get_search_paginator(query)
+                statuses, next_page = await paginator.aget_page(request)
+                context["next_query"] = get_next_query(
+                    request, paginator, next_page
+                )
+            else:
+                statuses = await aget_statuses()
+            context["statuses"] = statuses
+            response = await arender(request, "status/statuses.html", context)
 
+        return set_validators(response, etag, last_modified, private=True)
+
+
+class StatusesApiView(AuthRequiredMixin, View):
+    """
+    The status catalogue as JSON. The ETag is derived from the cached
+    catalogue, so revalidating doesn't query the statuses table.
+    """
+
+    def handle_no_authentication(self, request):
+        return JsonResponse({"error": AUTHENTICATION_ERROR}, status=401)
 
-class StatusCreateView(View):
     def get(self, request):
-        if request.user.is_authenticated:
-            form = StatusForm()
-            return render(request, "status/create.html", {"form": form})
+        etag = get_etag()
+        statuses = get_statuses()
+
+        def get_data():
+            return {
+                "results": [
+                    {
+                        "id": status.id,
+                        "name": status.name,
+                        "created_at": status.created_at,
+                    }
+                    for status in statuses
+                ]
+            }
+
+        return conditional_json(request, etag, get_data, private=True)
+
 
-        messages.add_message(request, messages.ERROR, AUTHENTICATION_ERROR)
-        return redirect("login")
+class StatusCreateView(AuthRequiredMixin, View):
+    def get(self, request):
+        form = StatusForm()
+        return render(request, "status/create.html", {"form": form})
 
     def post(self, request):
-        if request.user.is_authenticated:
-            form = StatusForm(request.POST)
-            if form.is_valid():
-                form.save()
-                messages.add_message(
-                    request, messages.SUCCESS, STATUS_CREATE_SUCCESS
-                )
-                return redirect("statuses")
+        form = StatusForm(request.POST)
+        if form.is_valid():
+            form.save()
+            messages.add_message(
+                request, messages.SUCCESS, STATUS_CREATE_SUCCESS
+            )
+            return redirect("statuses")
 
-        messages.add_message(request, messages.ERROR, AUTHENTICATION_ERROR)
-        return redirect("login")
+        return render(request, "status/create.html", {"form": form})
 
 
-class StatusUpdateView(View):
+class StatusUpdateView(AuthRequiredMixin, View):
     def get(self, request, **kwargs):
-        if request.user.is_authenticated:
-            pk = kwargs.get("pk")
-            status = get_object_or_404(Status, id=pk)
-            form = StatusForm(initial={"name": status.name})
-            return render(
-                request, "status/update.html", {"form": form, "status": status}
+        pk = kwargs.get("pk")
+        status = get_object_or_404(Status, id=pk)
+        form = StatusForm(initial={"name": status.name})
+        return render(
+            request, "status/update.html", {"form": form, "status": status}
+        )
+
+    def post(self, request, **kwargs):
+        pk = kwargs.get("pk")
+        form = StatusUpdateForm(request.POST, pk=pk)
+
+        if form.is_valid():
+            updated = Status.objects.filter(id=pk).update(
+                name=form.cleaned_data["name"]
             )
+            if not updated:
+                raise Http404
+            invalidate_on_commit()
 
-        messages.add_message(request, messages.ERROR, AUTHENTICATION_ERROR)
-        return redirect("login")
+            messages.add_message(
+                request, messages.SUCCESS, STATUS_UPDATE_SUCCESS
+            )
+            return redirect("statuses")
 
-    def post(self, request, **kwargs):
-        if request.user.is_authenticated:
-            pk = kwargs.get("pk")
-            status = get_object_or_404(Status, id=pk)
-            form = StatusForm(request.POST, instance=status)
-
-            if form.is_valid():
-                form.save()
-                messages.add_message(
-                    request, messages.SUCCESS, STATUS_UPDATE_SUCCESS
-                )
-                return redirect("statuses")
+        # The template shows the current name.
+        status = get_object_or_404(Status, id=pk)
+        return render(
+            request, "status/update.html", {"form": form, "status": status}
+        )
 
-            return render(
-                request, "status/update.html", {"form": form, "status": status}
+
+def delete_unused(pk):
+    """
+    Deletes the status unless a task uses it, in a single statement:
+    DELETE ... WHERE id = pk AND NOT EXISTS (<tasks with the status>).
+    Returns how many rows were deleted. Unlike QuerySet.delete() the row
+    isn't loaded first, so no post_delete is sent: the catalogue is
+    invalidated here.
+    """
+    quote = connection.ops.quote_name
+    table = quote(Status._meta.db_table)
+    pk_column = quote(Status._meta.pk.column)
+    tasks = quote(Task._meta.db_table)
+    status_column = quote(Task._meta.get_field("status").column)
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE {pk_column} = %s AND NOT EXISTS "
+                f"(SELECT 1 FROM {tasks} "
+                f"WHERE {tasks}.{status_column} = {table}.{pk_column})",
+                [pk],
             )
+            deleted = cursor.rowcount
+    except IntegrityError:
+        # A task took the status while the row was being deleted.
+        return 0
 
-        messages.add_message(request, messages.ERROR, AUTHENTICATION_ERROR)
-        return redirect("login")
+    if deleted:
+        invalidate_on_commit()
+    return deleted
 
 
-class StatusDeleteView(View):
+class StatusDeleteView(AuthRequiredMixin, View):
     def get(self, request, **kwargs):
-        if not request.user.is_authenticated:
-            messages.add_message(request, messages.ERROR, AUTHENTICATION_ERROR)
-            return redirect("login")
-
         pk = kwargs.get("pk")
         status = get_object_or_404(Status, id=pk)
         return render(request, "status/delete.html", {"status": status})
 
     def post(self, request, **kwargs):
         """
-        Добавить проверку задач с данным статусом
+        Deletes the status unless a task uses it. Only when nothing was
+        deleted a second query tells why.
         """
-        if not request.user.is_authenticated:
-            messages.add_message(request, messages.ERROR, AUTHENTICATION_ERROR)
-            return redirect("login")
-
         pk = kwargs.get("pk")
-        status = get_object_or_404(Status, id=pk)
-        status.delete()
+
+        if not delete_unused(pk):
+            if not Status.objects.filter(id=pk).exists():
+                raise Http404
+            messages.add_message(
+                request, messages.ERROR, STATUS_DELETE_ERROR
+            )
+            return redirect("statuses")
+
         messages.add_message(request, messages.SUCCESS, STATUS_DELETE_SUCCESS)
         return redirect("statuses")
+
+
+class StatusBulkView(AuthRequiredMixin, View):
+    """
+    GET streams every status as CSV or JSON lines (?format=jsonl),
+    POST imports a CSV or JSON lines body (by Content-Type).
+    """
+
+    content_types = {"csv": "text/csv", "jsonl": "application/jsonl"}
+
+    def get(self, request):
+        fmt = request.GET.get("format", "csv")
+        if fmt not in bulk.FORMATS:
+            return JsonResponse({"error": UNKNOWN_FORMAT}, status=400)
+
+        response = StreamingHttpResponse(
+            bulk.export_statuses(fmt), content_type=self.content_types[fmt]
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="statuses.{fmt}"'
+        )
+        return response
+
+    def post(self, request):
+        fmt = "csv" if request.content_type == "text/csv" else "jsonl"
+        lines = codecs.iterdecode(request, "utf-8")
+
+        try:
+            created = bulk.import_statuses(bulk.read_rows(lines, fmt))
+        except bulk.BulkImportError as e:
+            return JsonResponse({"errors": e.errors}, status=400)
+        except UnicodeDecodeError:
+            return JsonResponse({"error": INVALID_ENCODING}, status=400)
+
+        return JsonResponse({"created": created}, status=201)
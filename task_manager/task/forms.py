@@ -0,0 +1,54 @@
+from django import forms
+from django.urls import reverse_lazy
+from django.utils.translation import gettext_lazy as _
+
+from task_manager.status.forms import StatusChoiceField
+from task_manager.user.views import get_users
+
+
+class ExecutorField(forms.ModelChoiceField):
+    """
+    Executor picked by username in a text input, suggested as you type
+    from the users API (see task/tasks.html). A select would render
+    every user on every page; validation is one lookup of the unique
+    username instead. Staff accounts are left out, like on the users
+    page.
+    """
+
+    widget = forms.TextInput
+
+    def __init__(self, **kwargs):
+        super().__init__(
+            queryset=get_users(), to_field_name="username", **kwargs
+        )
+
+    def widget_attrs(self, widget):
+        attrs = super().widget_attrs(widget)
+        attrs.update(
+            {
+                "list": "executors",
+                "autocomplete": "off",
+                "data-source": reverse_lazy("api_users"),
+            }
+        )
+        return attrs
+
+
+class TaskFilterForm(forms.Form):
+    status = StatusChoiceField(label=_("Status"), required=False)
+    executor = ExecutorField(label=_("Executor"), required=False)
+    self_tasks = forms.BooleanField(label=_("Only my tasks"), required=False)
+
+    def get_filters(self, user):
+        """Task lookups for the valid fields of the form."""
+        data = self.cleaned_data if self.is_bound else {}
+        filters = {}
+
+        if data.get("status"):
+            filters["status_id"] = data["status"].id
+        if data.get("executor"):
+            filters["executor_id"] = data["executor"].id
+        if data.get("self_tasks"):
+            filters["author_id"] = user.id
+
+        return filters
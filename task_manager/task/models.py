@@ -0,0 +1,56 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+from task_manager.status.models import Status
+
+
+class Task(models.Model):
+    name = models.CharField(max_length=150)
+    description = models.TextField(blank=True)
+    # No single-column indexes on the foreign keys: each one leads a
+    # composite index below, which also serves the deletion guards.
+    status = models.ForeignKey(
+        Status,
+        on_delete=models.PROTECT,
+        related_name="tasks",
+        db_index=False,
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        related_name="authored_tasks",
+        db_index=False,
+    )
+    executor = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        related_name="executed_tasks",
+        null=True,
+        blank=True,
+        db_index=False,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        # One per list filter, ending with the keyset pagination order.
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], name="task_created_at_idx"
+            ),
+            models.Index(
+                fields=["status", "created_at", "id"],
+                name="task_status_created_idx",
+            ),
+            models.Index(
+                fields=["executor", "created_at", "id"],
+                name="task_executor_created_idx",
+            ),
+            models.Index(
+                fields=["author", "created_at", "id"],
+                name="task_author_created_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,130 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from task_manager.status.cache import get_cache, get_statuses
+from task_manager.status.models import Status
+from task_manager.testing import QueryBudgetMixin
+from .models import Task
+
+
+class TestTasksView(QueryBudgetMixin, TestCase):
+    def setUp(self) -> None:
+        get_cache().clear()
+        self.users = [
+            User.objects.create(
+                first_name="Bob", last_name="WoW", username="wiku"
+            ),
+            User.objects.create(
+                first_name="Rob", last_name="Glo", username="gl"
+            ),
+        ]
+        self.statuses = [
+            Status.objects.create(name="New"),
+            Status.objects.create(name="Done"),
+        ]
+        self.tasks = [
+            Task.objects.create(
+                name="Write tests",
+                status=self.statuses[0],
+                author=self.users[0],
+                executor=self.users[1],
+            ),
+            Task.objects.create(
+                name="Fix bug",
+                status=self.statuses[1],
+                author=self.users[1],
+                executor=self.users[0],
+            ),
+            Task.objects.create(
+                name="Deploy",
+                status=self.statuses[0],
+                author=self.users[1],
+            ),
+        ]
+        self.client.force_login(self.users[0])
+        return super().setUp()
+
+    def get_tasks(self, **params):
+        resp = self.client.get(reverse("tasks"), params)
+        return [task.name for task in resp.context["tasks"]]
+
+    def test_lists_all_tasks(self):
+        resp = self.client.get(reverse("tasks"))
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertTemplateUsed(resp, "task/tasks.html")
+        self.assertContains(resp, "Rob Glo")
+        self.assertEqual(
+            self.get_tasks(), ["Write tests", "Fix bug", "Deploy"]
+        )
+
+    def test_filters(self):
+        self.assertEqual(
+            self.get_tasks(status=self.statuses[0].id),
+            ["Write tests", "Deploy"],
+        )
+        self.assertEqual(self.get_tasks(executor="wiku"), ["Fix bug"])
+        self.assertEqual(self.get_tasks(self_tasks="on"), ["Write tests"])
+        self.assertEqual(
+            self.get_tasks(status=self.statuses[0].id, self_tasks="on"),
+            ["Write tests"],
+        )
+
+    def test_invalid_filter_is_ignored(self):
+        resp = self.client.get(reverse("tasks"), {"status": 100})
+
+        self.assertTrue(resp.context["form"].errors)
+        self.assertEqual(len(resp.context["tasks"]), 3)
+
+    def test_executor_is_a_non_staff_username(self):
+        User.objects.create(username="admin", is_staff=True)
+        resp = self.client.get(reverse("tasks"), {"executor": "admin"})
+
+        self.assertIn("executor", resp.context["form"].errors)
+        executor = str(resp.context["form"]["executor"])
+        self.assertIn('list="executors"', executor)
+        self.assertNotIn("Rob Glo", executor)
+
+    @override_settings(PAGE_SIZE=1)
+    def test_pagination_keeps_filters(self):
+        status = self.statuses[0].id
+        resp = self.client.get(reverse("tasks"), {"status": status})
+        next_query = resp.context["next_query"]
+
+        self.assertIn(f"status={status}", next_query)
+
+        resp = self.client.get(f"{reverse('tasks')}?{next_query}")
+        self.assertEqual(
+            [task.name for task in resp.context["tasks"]], ["Deploy"]
+        )
+        self.assertIsNone(resp.context["next_query"])
+
+    def test_anonymous(self):
+        self.client.logout()
+
+        with self.assertMaxQueries(0):
+            resp = self.client.get(reverse("tasks"))
+        self.assertRedirects(resp, reverse("login"))
+
+    def test_list_is_one_query(self):
+        def seed(count):
+            Task.objects.bulk_create(
+                Task(
+                    name=f"task-{i}",
+                    status=self.statuses[i % 2],
+                    author=self.users[i % 2],
+                    executor=self.users[(i + 1) % 2],
+                )
+                for i in range(count)
+            )
+
+        def request():
+            self.client.get(reverse("tasks"), {"page_size": 1000})
+
+        # Session, user and the tasks with their status, author and
+        # executor. Status choices come from the cached catalogue, the
+        # executor is a text input.
+        get_statuses()
+        with self.assertMaxQueries(3):
+            request()
+        self.assertQueriesDoNotGrow(seed, request)
@@ -0,0 +1,53 @@
+from django.views import View
+from django.shortcuts import render
+from .forms import TaskFilterForm
+from .models import Task
+from task_manager.mixins import AuthRequiredMixin
+from task_manager.pagination import KeysetPaginator, get_next_query
+
+
+TASKS_LIST_FIELDS = (
+    "id",
+    "name",
+    "created_at",
+    "status__name",
+    "author__first_name",
+    "author__last_name",
+    "executor__first_name",
+    "executor__last_name",
+)
+
+
+def get_tasks(filters):
+    """
+    Tasks with their status, author and executor in one query. Each
+    filter has an index on (<filter>, created_at, id), the pagination
+    order, so every page is a range scan of one index.
+    """
+    return (
+        Task.objects.filter(**filters)
+        .select_related("status", "author", "executor")
+        .only(*TASKS_LIST_FIELDS)
+    )
+
+
+class TasksView(AuthRequiredMixin, View):
+    def get(self, request):
+        form = TaskFilterForm(request.GET or None)
+        # Invalid filters are reported by the form and not applied.
+        form.is_valid()
+
+        paginator = KeysetPaginator(
+            get_tasks(form.get_filters(request.user)), "created_at"
+        )
+        tasks, next_cursor = paginator.get_page(request)
+
+        return render(
+            request,
+            "task/tasks.html",
+            {
+                "tasks": tasks,
+                "form": form,
+                "next_query": get_next_query(request, paginator, next_cursor),
+            },
+        )
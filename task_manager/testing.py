@@ -0,0 +1,59 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin guarding views against query regressions.
+
+    assertMaxQueries() caps the number of queries of a block, and
+    assertQueriesDoNotGrow() fails when a view issues more queries as the
+    number of rows it lists grows, which is how N+1 loops show up.
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, limit, using=DEFAULT_DB_ALIAS):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+
+        executed = len(context)
+        self.assertLessEqual(
+            executed,
+            limit,
+            f"{executed} queries executed, {limit} allowed:\n"
+            + self._format_queries(context),
+        )
+
+    def assertQueriesDoNotGrow(
+        self, seed, request, small=10, large=1000, using=DEFAULT_DB_ALIAS
+    ):
+        """
+        Calls `seed(n)` to add n rows, then `request()`, once with `small`
+        rows and once with `large` rows in total, and compares the number
+        of queries of the two requests.
+        """
+        connection = connections[using]
+
+        seed(small)
+        with CaptureQueriesContext(connection) as few:
+            request()
+
+        seed(large - small)
+        with CaptureQueriesContext(connection) as many:
+            request()
+
+        self.assertEqual(
+            len(few),
+            len(many),
+            f"{len(few)} queries with {small} rows, "
+            f"{len(many)} with {large} rows:\n" + self._format_queries(many),
+        )
+
+    @staticmethod
+    def _format_queries(context):
+        return "\n".join(
+            f"{i}. {query['sql']}"
+            for i, query in enumerate(context.captured_queries, start=1)
+        )
@@ -0,0 +1,648 @@
+import gzip
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+import brotli
+from asgiref.sync import iscoroutinefunction
+from psycopg2 import OperationalError
+from psycopg2.pool import PoolError
+from django.conf import settings
+from django.templatetags.static import static
+from django.test import (
+    AsyncRequestFactory,
+    Client,
+    TestCase,
+    override_settings,
+)
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher,
+    get_hasher,
+    make_password,
+)
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+from django.urls import reverse
+from urllib.parse import urlencode
+from . import metrics, warmup
+from .bench import get_route_names
+from .checks import check_password_hasher
+from .decorators import cache_anonymous_page
+from .middleware import AsyncCapableMiddleware, CompressionMiddleware
+from .db.pooled_postgresql.base import BlockingConnectionPool
+from .management.commands.bench import Command as BenchCommand
+from .testing import QueryBudgetMixin
+from .user.views import AsyncUsersView
+
+
+def count_hashes():
+    hasher = type(get_hasher())
+    return mock.patch.object(
+        hasher,
+        "encode",
+        autospec=True,
+        side_effect=hasher.encode,
+    )
+
+
+class TestLoginView(TestCase):
+    def setUp(self) -> None:
+        user1 = User.objects.create(
+            first_name="Bob",
+            last_name="WoW",
+            username="wiku",
+        )
+        user1.set_password("Pukote74.")
+        user1.save()
+        cache.clear()
+        return super().setUp()
+
+    def login(self, password):
+        return self.client.post(
+            reverse("login"),
+            urlencode({"username": "wiku", "password": password}),
+            content_type="application/x-www-form-urlencoded",
+            follow=True,
+        )
+
+    def test_view_post_success_hashes_once(self):
+        with count_hashes() as encode:
+            resp = self.login("Pukote74.")
+
+        self.assertEqual(encode.call_count, 1)
+        self.assertRedirects(resp, reverse("main"))
+        message = list(resp.context.get("messages"))[0]
+        self.assertEqual(message.tags, "success")
+
+    def test_view_post_wrong_password_hashes_once(self):
+        with count_hashes() as encode:
+            resp = self.login("wrong")
+
+        self.assertEqual(encode.call_count, 1)
+        self.assertTemplateUsed(resp, "login.html")
+        message = list(resp.context.get("messages"))[0]
+        self.assertEqual(message.tags, "error")
+
+    @override_settings(LOGIN_THROTTLE_ATTEMPTS=2)
+    def test_view_post_throttled(self):
+        self.login("wrong")
+        self.login("wrong")
+
+        with count_hashes() as encode:
+            resp = self.login("Pukote74.")
+
+        self.assertEqual(encode.call_count, 0)
+        self.assertEqual(resp.status_code, 429)
+        self.assertFalse(resp.context["user"].is_authenticated)
+
+    @override_settings(
+        PASSWORD_HASHERS=[
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+            "task_manager.hashers.PBKDF2PasswordHasher",
+        ]
+    )
+    def test_view_post_upgrades_hasher(self):
+        user = User.objects.get(username="wiku")
+        user.password = make_password("Pukote74.", hasher="pbkdf2_sha256")
+        user.save()
+
+        self.login("Pukote74.")
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("md5$"))
+        self.assertTrue(user.check_password("Pukote74."))
+
+    @override_settings(
+        PASSWORD_HASHERS=["task_manager.hashers.PBKDF2PasswordHasher"],
+        PASSWORD_HASHER_COST=1000,
+    )
+    def test_view_post_upgrades_cost(self):
+        user = User.objects.get(username="wiku")
+        user.password = PBKDF2PasswordHasher().encode("Pukote74.", "salt")
+        user.save()
+
+        self.login("Pukote74.")
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$1000$"))
+        self.assertTrue(user.check_password("Pukote74."))
+
+
+class TestPasswordHasherCheck(TestCase):
+    def get_ids(self):
+        return [message.id for message in check_password_hasher(None)]
+
+    def test_default(self):
+        self.assertListEqual(self.get_ids(), [])
+
+    @override_settings(
+        PASSWORD_HASHERS=["task_manager.hashers.Argon2PasswordHasher"]
+    )
+    def test_missing_library(self):
+        with mock.patch(
+            "task_manager.checks.import_module", side_effect=ImportError
+        ):
+            self.assertListEqual(self.get_ids(), ["task_manager.E002"])
+
+    def test_invalid_cost(self):
+        for hasher, cost in (
+            ("ScryptPasswordHasher", 1000),
+            ("BCryptSHA256PasswordHasher", 32),
+            ("PBKDF2PasswordHasher", -1),
+        ):
+            with self.subTest(hasher), mock.patch(
+                "task_manager.checks.import_module"
+            ), override_settings(
+                PASSWORD_HASHERS=[f"task_manager.hashers.{hasher}"],
+                PASSWORD_HASHER_COST=cost,
+            ):
+                self.assertListEqual(self.get_ids(), ["task_manager.E003"])
+
+    @override_settings(
+        PASSWORD_HASHERS=["task_manager.hashers.ScryptPasswordHasher"],
+        PASSWORD_HASHER_COST=2**15,
+    )
+    def test_valid_cost(self):
+        self.assertListEqual(self.get_ids(), [])
+
+
+class TestSessions(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="wiku")
+        return super().setUp()
+
+    @override_settings(
+        SESSION_ENGINE="django.contrib.sessions.backends.cached_db"
+    )
+    def test_cached_db_skips_session_query(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("statuses"))
+
+        # Only the user lookup is left, the status list is cached too.
+        with self.assertNumQueries(1):
+            self.client.get(reverse("statuses"))
+
+    @override_settings(
+        SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies"
+    )
+    def test_signed_cookies_skip_session_table(self):
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse("statuses"))
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(Session.objects.exists())
+
+    def test_purge_sessions_in_batches(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(
+                session_key=f"expired{i}",
+                session_data="",
+                expire_date=now - timedelta(days=1),
+            )
+        Session.objects.create(
+            session_key="alive",
+            session_data="",
+            expire_date=now + timedelta(days=1),
+        )
+
+        out = StringIO()
+        call_command("purge_sessions", batch_size=2, stdout=out)
+
+        self.assertIn("Deleted 5", out.getvalue())
+        self.assertListEqual(
+            list(Session.objects.values_list("pk", flat=True)), ["alive"]
+        )
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=60)
+class TestPageCache(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create(username="wiku")
+        return super().setUp()
+
+    def test_anonymous_page_is_cached(self):
+        self.client.get(reverse("users"))
+
+        with self.assertNumQueries(0):
+            resp = self.client.get(reverse("users"))
+
+        self.assertContains(resp, "wiku")
+        self.assertIn("Cookie", resp["Vary"])
+        self.assertIn("max-age=0", resp["Cache-Control"])
+
+    def test_cached_page_is_revalidated(self):
+        etag = self.client.get(reverse("users"))["ETag"]
+
+        with self.assertNumQueries(0):
+            resp = self.client.get(reverse("users"), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(resp.status_code, 304)
+
+    def test_authenticated_page_is_not_cached(self):
+        self.client.get(reverse("users"))
+        User.objects.create(username="lovz")
+
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse("users"))
+
+        self.assertContains(resp, "lovz")
+        self.assertContains(resp, "csrfmiddlewaretoken")
+
+    async def test_async_view_is_cached(self):
+        view = cache_anonymous_page(AsyncUsersView.as_view())
+        self.assertTrue(iscoroutinefunction(view))
+
+        def get(**headers):
+            request = AsyncRequestFactory().get(reverse("users"), **headers)
+            request.user = AnonymousUser()
+            return view(request)
+
+        await get()
+        await User.objects.acreate(username="lovz")
+        resp = await get()
+
+        # Served from the cache: the new user isn't listed yet.
+        self.assertContains(resp, "wiku")
+        self.assertNotContains(resp, "lovz")
+        self.assertIn("max-age=0", resp["Cache-Control"])
+
+        # Django 4.1's AsyncRequestFactory takes raw ASGI headers.
+        resp = await get(**{"if-none-match": resp["ETag"]})
+        self.assertEqual(resp.status_code, 304)
+
+    def test_navigation_fragment_depends_on_authentication(self):
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse("main"))
+        self.assertContains(resp, reverse("statuses"))
+
+        self.client.logout()
+        resp = self.client.get(reverse("main"))
+        self.assertNotContains(resp, reverse("statuses"))
+        self.assertContains(resp, reverse("login"))
+
+
+@override_settings(METRICS_ENABLED=True)
+class TestMetrics(TestCase):
+    def setUp(self) -> None:
+        metrics.reset()
+        self.user = User.objects.create(username="wiku")
+        return super().setUp()
+
+    def test_server_timing_header(self):
+        resp = self.client.get(reverse("users"))
+
+        timing = resp["Server-Timing"]
+        self.assertIn("app;dur=", timing)
+        self.assertIn('desc="1 queries"', timing)
+        self.assertNotIn("tpl;dur=0.0", timing)
+
+    def test_metrics_endpoint_is_staff_only(self):
+        self.client.get(reverse("users"))
+
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse("metrics"))
+        self.assertEqual(resp.status_code, 302)
+
+        self.user.is_staff = True
+        self.user.save()
+        resp = self.client.get(reverse("metrics"))
+        routes = resp.json()["routes"]
+
+        self.assertEqual(routes["GET /users/"]["wall_ms"]["count"], 1)
+        self.assertEqual(routes["GET /users/"]["queries"]["sum"], 1)
+        self.assertIn("status_cache", resp.json())
+
+    async def test_async_requests(self):
+        resp = await self.async_client.get(reverse("users"))
+
+        self.assertIn('desc="1 queries"', resp["Server-Timing"])
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        resp = self.client.get(reverse("users"))
+
+        self.assertNotIn("Server-Timing", resp)
+        self.assertDictEqual(metrics.snapshot(), {})
+
+
+class TestQueries(QueryBudgetMixin, TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="wiku")
+        self.user.set_password("Pukote74.")
+        self.user.save()
+        return super().setUp()
+
+    def test_main(self):
+        with self.assertMaxQueries(0):
+            self.client.get(reverse("main"))
+
+        self.client.force_login(self.user)
+        with self.assertMaxQueries(2):
+            self.client.get(reverse("main"))
+
+    def test_login_logout(self):
+        with self.assertMaxQueries(0):
+            self.client.get(reverse("login"))
+
+        data = {"username": "wiku", "password": "Pukote74."}
+        with self.assertMaxQueries(9):
+            self.client.post(reverse("login"), data)
+
+        with self.assertMaxQueries(4):
+            self.client.post(reverse("logout"))
+
+
+class TestStaticFiles(TestCase):
+    def test_layout_uses_vendored_assets(self):
+        resp = self.client.get(reverse("main"))
+
+        self.assertContains(resp, "jquery.slim.min.js")
+        self.assertNotContains(resp, "cdn.jsdelivr.net")
+        self.assertNotContains(resp, "code.jquery.com")
+
+    def test_hashed_and_compressed_files(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(
+            STATIC_ROOT=root,
+            STATICFILES_STORAGE=(
+                "whitenoise.storage.CompressedManifestStaticFilesStorage"
+            ),
+            MIDDLEWARE=[
+                "whitenoise.middleware.WhiteNoiseMiddleware",
+                *settings.MIDDLEWARE,
+            ],
+        ):
+            call_command(
+                "collectstatic",
+                interactive=False,
+                ignore_patterns=["admin"],
+                verbosity=0,
+            )
+            url = static("vendor/jquery-3.5.1/jquery.slim.min.js")
+            resp = Client().get(url, HTTP_ACCEPT_ENCODING="gzip, br")
+            resp.close()
+
+        self.assertRegex(url, r"/jquery\.slim\.min\.[0-9a-f]{12}\.js$")
+        self.assertEqual(resp["Content-Encoding"], "br")
+        self.assertIn("immutable", resp["Cache-Control"])
+
+
+class TestCompression(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="wiku")
+        User.objects.bulk_create(
+            User(username=f"user-{i}", first_name="Bob") for i in range(50)
+        )
+        return super().setUp()
+
+    def test_brotli_preferred(self):
+        plain = self.client.get(reverse("users"))
+        resp = self.client.get(
+            reverse("users"), HTTP_ACCEPT_ENCODING="gzip, br"
+        )
+
+        self.assertEqual(resp["Content-Encoding"], "br")
+        self.assertIn("Accept-Encoding", resp["Vary"])
+        self.assertEqual(brotli.decompress(resp.content), plain.content)
+
+    def test_gzip(self):
+        resp = self.client.get(reverse("users"), HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertIn(b"user-48", gzip.decompress(resp.content))
+
+    async def test_async_requests(self):
+        # Django 4.1's AsyncClient takes raw ASGI header names.
+        resp = await self.async_client.get(
+            reverse("users"), **{"accept-encoding": "gzip"}
+        )
+
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertIn(b"user-48", gzip.decompress(resp.content))
+
+    def test_runs_in_the_mode_of_the_handler(self):
+        async def get_response(request):
+            pass
+
+        self.assertTrue(
+            iscoroutinefunction(CompressionMiddleware(get_response))
+        )
+        self.assertFalse(
+            iscoroutinefunction(CompressionMiddleware(lambda request: None))
+        )
+
+    def test_middleware_must_implement_both_modes(self):
+        class SyncOnlyMiddleware(AsyncCapableMiddleware):
+            def __call__(self, request):
+                return self.get_response(request)
+
+        with self.assertRaises(TypeError):
+            SyncOnlyMiddleware(lambda request: None)
+
+    @override_settings(COMPRESS_MIN_SIZE=10**6)
+    def test_small_responses_are_not_compressed(self):
+        resp = self.client.get(reverse("users"), HTTP_ACCEPT_ENCODING="br")
+
+        self.assertNotIn("Content-Encoding", resp)
+
+    def test_streamed_export(self):
+        self.client.force_login(self.user)
+        resp = self.client.get(
+            reverse("export_users"), HTTP_ACCEPT_ENCODING="gzip"
+        )
+        body = gzip.decompress(b"".join(resp.streaming_content))
+
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertEqual(len(body.decode().splitlines()), 52)
+
+    def test_etag_is_weakened_and_still_matches(self):
+        resp = self.client.get(reverse("users"), HTTP_ACCEPT_ENCODING="br")
+        etag = resp["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+
+        resp = self.client.get(
+            reverse("users"),
+            HTTP_ACCEPT_ENCODING="br",
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(resp.status_code, 304)
+
+
+class TestWarmup(TestCase):
+    def setUp(self) -> None:
+        warmup.reset_templates()
+        return super().setUp()
+
+    def get_cached(self):
+        engine = next(warmup.get_engines())
+        return engine.template_loaders[0].get_template_cache
+
+    def test_compiles_the_project_templates(self):
+        warmup.run()
+        names = warmup.get_template_names(next(warmup.get_engines()))
+
+        self.assertIn("base.html", names)
+        self.assertIn("user/users.html", names)
+        self.assertNotIn("admin/base.html", names)
+        self.assertEqual(sorted(self.get_cached()), names)
+
+    @override_settings(WARMUP=False)
+    def test_disabled(self):
+        warmup.run()
+
+        self.assertDictEqual(self.get_cached(), {})
+
+    def test_check_reports_compile_times(self):
+        stderr = StringIO()
+        call_command(
+            "check", "--deploy", "--tag", "templates", stderr=stderr
+        )
+
+        self.assertRegex(
+            stderr.getvalue(),
+            r"user/users.html: \(task_manager.I001\) Compiled in [\d.]+ms",
+        )
+
+    def test_check_reports_syntax_errors(self):
+        with tempfile.TemporaryDirectory(dir=settings.BASE_DIR) as tmpdir:
+            with open(f"{tmpdir}/broken.html", "w") as file:
+                file.write("{% if %}")
+            loaders = ["django.template.loaders.filesystem.Loader"]
+            templates = [{**settings.TEMPLATES[0], "DIRS": [tmpdir]}]
+            templates[0]["OPTIONS"] = {
+                **templates[0]["OPTIONS"],
+                "loaders": loaders,
+            }
+
+            with override_settings(TEMPLATES=templates):
+                timings, errors = warmup.compile_templates()
+
+        self.assertDictEqual(timings, {})
+        self.assertEqual(list(errors), ["broken.html"])
+
+
+@mock.patch("psycopg2.pool.psycopg2.connect")
+class TestConnectionPool(TestCase):
+    def test_waits_for_a_connection(self, connect):
+        pool = BlockingConnectionPool(0, 1, timeout=5)
+        first = pool.getconn()
+
+        timer = threading.Timer(0.1, pool.putconn, [first])
+        timer.start()
+        second = pool.getconn()
+        timer.join()
+
+        self.assertEqual(connect.call_count, 2)
+        pool.putconn(second)
+
+    def test_times_out(self, connect):
+        pool = BlockingConnectionPool(0, 1, timeout=0.05)
+        pool.getconn()
+
+        with self.assertRaises(PoolError):
+            pool.getconn()
+
+    def test_keeps_connections_beyond_minconn(self, connect):
+        connect.side_effect = lambda *args, **kwargs: mock.MagicMock(
+            closed=False
+        )
+        pool = BlockingConnectionPool(1, 2, timeout=0.05)
+        first, second = pool.getconn(), pool.getconn()
+        pool.putconn(first)
+        pool.putconn(second)
+
+        reused = {pool.getconn(), pool.getconn()}
+
+        self.assertEqual(connect.call_count, 2)
+        self.assertSetEqual(reused, {first, second})
+        second.close.assert_not_called()
+
+    def test_failed_connect_frees_its_slot(self, connect):
+        pool = BlockingConnectionPool(0, 1, timeout=0.05)
+        connect.side_effect = [OperationalError, mock.MagicMock()]
+
+        with self.assertRaises(OperationalError):
+            pool.getconn()
+        pool.putconn(pool.getconn())
+
+
+class TestBenchCommand(TestCase):
+    def result(self, queries=3, p95=10, unexpected=0):
+        return {
+            "queries_per_request": queries,
+            "p95_ms": p95,
+            "unexpected": unexpected,
+            "expected_status": 200,
+        }
+
+    def compare(self, before, after, tolerance=25):
+        return BenchCommand.compare(
+            {"scenarios": {"GET main": before}},
+            {"scenarios": {"GET main": after, "GET new": after}},
+            tolerance,
+        )
+
+    def test_compare_passes_within_tolerance(self):
+        regressions = self.compare(
+            self.result(), self.result(queries=2, p95=12.5)
+        )
+
+        self.assertListEqual(regressions, [])
+
+    def test_compare_reports_regressions(self):
+        self.assertListEqual(
+            self.compare(self.result(), self.result(queries=4)),
+            ["GET main: queries per request 3 -> 4"],
+        )
+        self.assertListEqual(
+            self.compare(self.result(), self.result(p95=12.6)),
+            ["GET main: p95 10ms -> 12.6ms"],
+        )
+        self.assertListEqual(
+            self.compare(self.result(), self.result(p95=11), tolerance=5),
+            ["GET main: p95 10ms -> 11ms"],
+        )
+        self.assertListEqual(
+            self.compare(self.result(), self.result(unexpected=1)),
+            ["GET main: 1 responses other than 200"],
+        )
+
+    def test_route_names_exclude_the_admin(self):
+        names = get_route_names()
+
+        self.assertIn("main", names)
+        self.assertIn("api_users", names)
+        self.assertFalse(any(name.startswith("admin:") for name in names))
+
+    def test_uncovered_routes(self):
+        results = {
+            "GET main": ("main", self.result()),
+            "POST login": ("login", self.result()),
+            "GET login": ("login", self.result()),
+        }
+
+        uncovered = BenchCommand.get_uncovered_routes(results)
+
+        self.assertNotIn("main", uncovered)
+        self.assertNotIn("login", uncovered)
+        self.assertIn("logout", uncovered)
+        self.assertListEqual(
+            uncovered, sorted(get_route_names() - {"main", "login"})
+        )
+
+    def test_test_database_restores_the_settings(self):
+        test_settings = connection.settings_dict["TEST"]
+        old_name = test_settings.get("NAME")
+
+        with mock.patch.object(connection, "creation") as creation:
+            with BenchCommand.test_database():
+                creation.create_test_db.assert_called_once()
+
+        creation.destroy_test_db.assert_called_once()
+        self.assertEqual(test_settings.get("NAME"), old_name)
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.cache import cache
+
+
+CACHE_KEY = "login-throttle:{}:{}"
+
+
+def _keys(request, username):
+    return [
+        CACHE_KEY.format("user", (username or "").lower()),
+        CACHE_KEY.format("ip", request.META.get("REMOTE_ADDR", "")),
+    ]
+
+
+def is_enabled():
+    return settings.LOGIN_THROTTLE_ATTEMPTS > 0
+
+
+def is_throttled(request, username):
+    """
+    Checked before the form is validated,
+    so a throttled attempt never reaches the password hasher.
+    """
+    if not is_enabled():
+        return False
+
+    attempts = cache.get_many(_keys(request, username)).values()
+    return any(
+        count >= settings.LOGIN_THROTTLE_ATTEMPTS for count in attempts
+    )
+
+
+def register_failure(request, username):
+    if not is_enabled():
+        return
+
+    for key in _keys(request, username):
+        cache.add(key, 0, settings.LOGIN_THROTTLE_TIMEOUT)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, settings.LOGIN_THROTTLE_TIMEOUT)
+
+
+def reset(request, username):
+    if not is_enabled():
+        return
+
+    cache.delete(_keys(request, username)[0])
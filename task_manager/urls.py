@@ -13,15 +13,22 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
-from .views import LoginView, LogoutView, MainView
+from .decorators import cache_anonymous_page
+from .views import LoginView, LogoutView, MainView, AsyncMainView
+from .metrics import metrics_view
+
+MainView = AsyncMainView if settings.ASYNC_VIEWS else MainView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("", MainView.as_view(), name="main"),
+    path("", cache_anonymous_page(MainView.as_view()), name="main"),
     path("users/", include("task_manager.user.urls")),
     path("login/", LoginView.as_view(), name="login"),
     path("logout/", LogoutView.as_view(), name="logout"),
     path("statuses/", include("task_manager.status.urls")),
+    path("tasks/", include("task_manager.task.urls")),
+    path("metrics/", metrics_view, name="metrics"),
 ]
@@ -0,0 +1,140 @@
+"""
+Bulk user provisioning for the import_users command.
+
+Rows are validated with UserCreateForm in the main process, while the
+password hashes, which dominate the cost, are computed by a pool of
+worker processes, one batch at a time. The users are only inserted once
+every row is valid and hashed, with bulk_create() in one short
+transaction: if any row is invalid nothing is created.
+"""
+import csv
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils.translation import gettext as _
+
+from task_manager.utils import batched
+from .forms import UserCreateForm
+
+
+MAX_ERRORS = 100
+
+DUPLICATE_USERNAME = _("Duplicate username")
+
+
+class BulkImportError(Exception):
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid rows")
+        self.errors = errors
+
+
+def read_rows(lines):
+    """
+    CSV with username, first_name, last_name and password columns.
+    Yields (line number, row) pairs, the header being line 1.
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def hash_password(password):
+    # Runs in the worker processes.
+    return make_password(password)
+
+
+def validate_batch(batch, seen, errors):
+    users = []
+    passwords = []
+
+    for line, row in batch:
+        password = row.get("password") or ""
+        form = UserCreateForm(
+            data={
+                "username": row.get("username"),
+                "first_name": row.get("first_name") or "",
+                "last_name": row.get("last_name") or "",
+                "password1": password,
+                "password2": password,
+            }
+        )
+        if not form.is_valid():
+            errors.append(
+                {"line": line, "errors": form.errors.get_json_data()}
+            )
+            continue
+
+        username = form.instance.username
+        if username in seen:
+            errors.append(
+                {
+                    "line": line,
+                    "errors": {
+                        "username": [
+                            {
+                                "message": DUPLICATE_USERNAME,
+                                "code": "unique",
+                            }
+                        ]
+                    },
+                }
+            )
+            continue
+
+        seen.add(username)
+        users.append(form.instance)
+        passwords.append(password)
+
+    return users, passwords
+
+
+def provision_users(rows, batch_size, workers):
+    """
+    Creates users from the (line number, row) pairs of read_rows() and
+    returns how many were created. `workers` is the size of the hashing
+    pool, 0 hashes in-process.
+    """
+    seen = set()
+    errors = []
+    users = []
+    executor = (
+        ProcessPoolExecutor(workers, initializer=django.setup)
+        if workers
+        else None
+    )
+
+    try:
+        for batch in batched(rows, batch_size):
+            batch_users, passwords = validate_batch(batch, seen, errors)
+            if errors:
+                # Keep validating to report more errors,
+                # but don't waste time on hashing.
+                if len(errors) >= MAX_ERRORS:
+                    break
+                continue
+
+            if executor:
+                chunksize = max(1, len(passwords) // (workers * 4))
+                hashes = executor.map(
+                    hash_password, passwords, chunksize=chunksize
+                )
+            else:
+                hashes = map(hash_password, passwords)
+
+            for user, password in zip(batch_users, hashes):
+                user.password = password
+            users.extend(batch_users)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    if errors:
+        raise BulkImportError(errors[:MAX_ERRORS])
+
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=batch_size)
+
+    return len(users)
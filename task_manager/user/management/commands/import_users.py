@@ -0,0 +1,59 @@
+import json
+import os
+import sys
+from contextlib import nullcontext
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.user import bulk
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users from a CSV file with username, first_name, "
+        "last_name and password columns. Passwords are hashed by a pool "
+        "of processes. Nothing is written if any row is invalid."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read, '-' for stdin.")
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.BULK_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Hashing processes, 0 hashes in the main process.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if path == "-":
+            source = nullcontext(sys.stdin)
+        else:
+            source = open(path, encoding="utf-8")
+
+        start = perf_counter()
+        try:
+            with source as lines:
+                created = bulk.provision_users(
+                    bulk.read_rows(lines),
+                    options["batch_size"],
+                    options["workers"],
+                )
+        except bulk.BulkImportError as e:
+            for error in e.errors:
+                self.stderr.write(json.dumps(error))
+            raise CommandError(str(e))
+        except UnicodeDecodeError as e:
+            raise CommandError(f"{path} is not valid UTF-8: {e}")
+
+        elapsed = perf_counter() - start
+        self.stdout.write(
+            f"Created {created} users in {elapsed:.2f}s "
+            f"({created / elapsed:.1f} users/s, "
+            f"{options['workers']} hashing workers)"
+        )
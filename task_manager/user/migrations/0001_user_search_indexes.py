@@ -0,0 +1,48 @@
+from django.db import migrations
+
+
+COLUMNS = ["username", "first_name", "last_name"]
+
+
+def get_indexes(schema_editor):
+    """
+    A LOWER() index on username for prefix searches, plus trigram
+    indexes for icontains on PostgreSQL, LOWER() indexes on the names
+    elsewhere (they are only matched by prefix there).
+    """
+    trigrams = schema_editor.connection.vendor == "postgresql"
+
+    for column in COLUMNS:
+        if column == "username" or not trigrams:
+            yield (
+                f'"auth_user_{column}_lower_idx"',
+                f'ON "auth_user" ((LOWER("{column}")))',
+            )
+        if trigrams:
+            yield (
+                f'"auth_user_{column}_trgm_idx"',
+                f'ON "auth_user" USING gin '
+                f'((UPPER("{column}"::text)) gin_trgm_ops)',
+            )
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, definition in get_indexes(schema_editor):
+        schema_editor.execute(f"CREATE INDEX {name} {definition}")
+
+
+def drop_indexes(apps, schema_editor):
+    for name, definition in get_indexes(schema_editor):
+        schema_editor.execute(f"DROP INDEX {name}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -1,7 +1,18 @@
-from django.test import TestCase
+from django.contrib.auth.models import AnonymousUser
+import tempfile
+from unittest import mock
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.test import TestCase, AsyncRequestFactory, override_settings
 from django.contrib.auth.models import User
+from django.db.models import QuerySet
 from django.urls import reverse
 from urllib.parse import urlencode
+from . import bulk
+from .views import AsyncUsersView
+from task_manager.status.models import Status
+from task_manager.task.models import Task
+from task_manager.testing import QueryBudgetMixin
 
 
 class TestUsersView(TestCase):
@@ -29,6 +40,169 @@ class TestUsersView(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertTemplateUsed(resp, "user/users.html")
         self.assertListEqual(list(resp.context["users"]), self.users[1:3])
+        self.assertIsNone(resp.context["next_cursor"])
+
+    @override_settings(PAGE_SIZE=1)
+    def test_keyset_pagination(self):
+        resp = self.client.get(reverse("users"))
+        self.assertListEqual(resp.context["users"], self.users[1:2])
+
+        cursor = resp.context["next_cursor"]
+        resp = self.client.get(reverse("users"), {"after": cursor})
+        self.assertListEqual(resp.context["users"], self.users[2:3])
+        self.assertIsNone(resp.context["next_cursor"])
+
+    def test_bad_cursor_returns_first_page(self):
+        resp = self.client.get(reverse("users"), {"after": "???"})
+        self.assertListEqual(resp.context["users"], self.users[1:3])
+
+    def test_search(self):
+        User.objects.create(first_name="Ann", last_name="Lee", username="glo")
+        User.objects.create(first_name="Gloria", last_name="X", username="zed")
+
+        def search(query):
+            resp = self.client.get(reverse("users"), {"q": query})
+            return [user.username for user in resp.context["users"]]
+
+        # The exact username first, then by username. Staff aren't listed.
+        self.assertListEqual(search("GLO"), ["glo", "gl", "zed"])
+        self.assertListEqual(search("uki"), ["lovz"])
+        self.assertListEqual(search("wiku"), [])
+        # Short queries match usernames only.
+        self.assertListEqual(search("G"), ["gl", "glo"])
+        # The last code point has no successor to bound the range with.
+        self.assertListEqual(search("gl\U0010ffff"), [])
+
+    @override_settings(PAGE_SIZE=1)
+    def test_search_pagination(self):
+        User.objects.create(username="glow")
+
+        resp = self.client.get(reverse("users"), {"q": "gl"})
+        self.assertListEqual(resp.context["users"], self.users[1:2])
+        self.assertEqual(
+            resp.context["next_query"], "q=gl&page=2&page_size=1"
+        )
+
+        next_query = resp.context["next_query"]
+        resp = self.client.get(f"{reverse('users')}?{next_query}")
+        self.assertEqual(resp.context["users"][0].username, "glow")
+        self.assertIsNone(resp.context["next_query"])
+
+    def test_authenticated_page_is_private(self):
+        resp = self.client.get(reverse("users"))
+        self.assertNotIn("private", resp["Cache-Control"])
+
+        self.client.force_login(self.users[1])
+        resp = self.client.get(reverse("users"))
+        self.assertIn("private", resp["Cache-Control"])
+
+    def test_export(self):
+        resp = self.client.get(reverse("export_users"), follow=True)
+        self.assertRedirects(resp, reverse("login"))
+
+        self.client.force_login(self.users[1])
+        resp = self.client.get(reverse("export_users"))
+        rows = b"".join(resp.streaming_content).decode().splitlines()
+
+        self.assertTrue(resp.streaming)
+        self.assertEqual(rows[0], "id,username,full_name,date_joined")
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(rows[1].startswith(f"{self.users[1].id},gl,Rob Glo"))
+
+
+class TestAsyncUsersView(TestCase):
+    def setUp(self) -> None:
+        self.users = [
+            User.objects.create(
+                first_name="Rob", last_name="Glo", username="gl"
+            ),
+            User.objects.create(
+                first_name="Uki", last_name="G", username="lovz"
+            ),
+        ]
+        return super().setUp()
+
+    @override_settings(PAGE_SIZE=1)
+    async def test_lists_users_page(self):
+        request = AsyncRequestFactory().get(reverse("users"))
+        request.user = AnonymousUser()
+
+        resp = await AsyncUsersView.as_view()(request)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Rob Glo")
+        self.assertNotContains(resp, "Uki G")
+        self.assertContains(resp, "?after=")
+        self.assertNotIn("private", resp["Cache-Control"])
+
+    async def test_authenticated_page_is_private(self):
+        request = AsyncRequestFactory().get(reverse("users"))
+        request.user = self.users[0]
+
+        resp = await AsyncUsersView.as_view()(request)
+
+        self.assertIn("private", resp["Cache-Control"])
+
+    async def test_search(self):
+        request = AsyncRequestFactory().get(reverse("users"), {"q": "uki"})
+        request.user = AnonymousUser()
+
+        resp = await AsyncUsersView.as_view()(request)
+
+        self.assertContains(resp, "Uki G")
+        self.assertNotContains(resp, "Rob Glo")
+
+
+class TestUsersApi(QueryBudgetMixin, TestCase):
+    def setUp(self) -> None:
+        self.users = [
+            User.objects.create(username=f"user-{i}") for i in range(3)
+        ]
+        return super().setUp()
+
+    def test_search(self):
+        resp = self.client.get(
+            reverse("api_users"), {"q": "user", "page_size": 2}
+        )
+        data = resp.json()
+
+        self.assertEqual(len(data["results"]), 2)
+        self.assertIn("q=user", data["next"])
+
+        resp = self.client.get(data["next"])
+        self.assertEqual(resp.json()["results"][0]["username"], "user-2")
+
+    def test_pagination(self):
+        resp = self.client.get(reverse("api_users"), {"page_size": 2})
+        data = resp.json()
+
+        self.assertEqual(
+            [user["username"] for user in data["results"]],
+            ["user-0", "user-1"],
+        )
+
+        resp = self.client.get(data["next"])
+        data = resp.json()
+
+        self.assertEqual(data["results"][0]["username"], "user-2")
+        self.assertIsNone(data["next"])
+
+    def test_conditional_get(self):
+        resp = self.client.get(reverse("api_users"))
+        etag = resp["ETag"]
+
+        with self.assertMaxQueries(1):
+            resp = self.client.get(
+                reverse("api_users"), HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(resp.status_code, 304)
+
+        self.users[0].first_name = "Bob"
+        self.users[0].save()
+        resp = self.client.get(reverse("api_users"), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["results"][0]["first_name"], "Bob")
 
 
 class TestRegistrationView(TestCase):
@@ -56,12 +230,12 @@ class TestRegistrationView(TestCase):
         self.assertEqual(message.tags, "success")
 
         resp_users = self.client.get(reverse("users"))
-        context_users = resp_users.context["users"].values()[0]
+        context_users = resp_users.context["users"][0]
         self.assertEquals(
             first=[
-                context_users["username"],
-                context_users["first_name"],
-                context_users["last_name"],
+                context_users.username,
+                context_users.first_name,
+                context_users.last_name,
             ],
             second=[
                 user_data["username"],
@@ -196,6 +370,44 @@ class TestDeleteUserView(TestCase):
         self.assertRedirects(resp, reverse("users"))
         self.assertEqual(message.tags, "success")
 
+    def test_view_post_user_in_use(self):
+        user, other = User.objects.all()
+        status = Status.objects.create(name="New")
+        self.client.force_login(user)
+
+        for roles in ({"author": other, "executor": user}, {"author": user}):
+            # A fresh task per case, so each side of the check is
+            # tested on its own.
+            Task.objects.all().delete()
+            Task.objects.create(name="Task", status=status, **roles)
+            resp = self.client.post(
+                reverse("delete_user", kwargs={"pk": user.id}), follow=True
+            )
+            message = list(resp.context.get("messages"))[0]
+
+            self.assertRedirects(resp, reverse("users"))
+            self.assertEqual(message.tags, "error")
+            self.assertTrue(User.objects.filter(id=user.id))
+
+    def test_view_post_user_taken_after_the_check(self):
+        user, other = User.objects.all()
+        status = Status.objects.create(name="New")
+        Task.objects.create(
+            name="Task", status=status, author=other, executor=user
+        )
+        self.client.force_login(user)
+
+        # As if the task was created right after the in-use check.
+        with mock.patch.object(QuerySet, "exists", return_value=False):
+            resp = self.client.post(
+                reverse("delete_user", kwargs={"pk": user.id}), follow=True
+            )
+        message = list(resp.context.get("messages"))[0]
+
+        self.assertRedirects(resp, reverse("users"))
+        self.assertEqual(message.tags, "error")
+        self.assertTrue(User.objects.filter(id=user.id))
+
     def test_view_get_wrong_user(self):
         self.client.login(username="wiku", password="Pukote74.")
         resp = self.client.get("/users/2/delete/", follow=True)
@@ -231,3 +443,196 @@ class TestDeleteUserView(TestCase):
         message = list(resp.context.get("messages"))[0]
         self.assertRedirects(resp, reverse("login"))
         self.assertEqual(message.tags, "error")
+
+
+class TestUserQueries(QueryBudgetMixin, TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="wiku")
+        return super().setUp()
+
+    @staticmethod
+    def seed(count):
+        offset = User.objects.count()
+        User.objects.bulk_create(
+            User(username=f"user-{offset + i}") for i in range(count)
+        )
+
+    def test_revalidation(self):
+        resp = self.client.get(reverse("users"))
+        etag = resp["ETag"]
+
+        # The page query only, nothing is rendered.
+        with self.assertMaxQueries(1):
+            resp = self.client.get(reverse("users"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp["ETag"], etag)
+
+        # The page looks different once signed in.
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse("users"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        etag = resp["ETag"]
+
+        User.objects.filter(id=self.user.id).update(first_name="Bob")
+        resp = self.client.get(reverse("users"), HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(resp, "Bob")
+
+    def test_users(self):
+        with self.assertMaxQueries(1):
+            self.client.get(reverse("users"))
+
+        self.client.force_login(self.user)
+        with self.assertMaxQueries(3):
+            self.client.get(reverse("users"))
+
+        self.assertQueriesDoNotGrow(
+            self.seed, lambda: self.client.get(reverse("users"))
+        )
+
+    def test_search(self):
+        def search():
+            self.client.get(reverse("users"), {"q": "user"})
+
+        with self.assertMaxQueries(1):
+            search()
+        self.assertQueriesDoNotGrow(self.seed, search)
+
+    def test_export(self):
+        self.client.force_login(self.user)
+
+        def export():
+            resp = self.client.get(reverse("export_users"))
+            b"".join(resp.streaming_content)
+
+        self.assertQueriesDoNotGrow(self.seed, export)
+
+    def test_registration(self):
+        with self.assertMaxQueries(0):
+            self.client.get(reverse("create_user"))
+
+        data = {
+            "username": "lovz",
+            "password1": "Pukote74.",
+            "password2": "Pukote74.",
+        }
+        with self.assertMaxQueries(2):
+            self.client.post(reverse("create_user"), data)
+
+    def test_update(self):
+        url = reverse("update_user", kwargs={"pk": self.user.id})
+        self.client.force_login(self.user)
+
+        with self.assertMaxQueries(2):
+            self.client.get(url)
+
+        data = {
+            "username": "wiku",
+            "password1": "Pukote74.",
+            "password2": "Pukote74.",
+        }
+        with self.assertMaxQueries(4):
+            self.client.post(url, data)
+
+    def test_delete(self):
+        url = reverse("delete_user", kwargs={"pk": self.user.id})
+        self.client.force_login(self.user)
+
+        with self.assertMaxQueries(2):
+            self.client.get(url)
+
+        # The EXISTS guard, then delete() checks the (empty) task
+        # relations on its own.
+        with self.assertMaxQueries(9):
+            self.client.post(url)
+
+    def test_rejected_requests_do_not_load_the_target(self):
+        other = User.objects.create(username="lovz")
+
+        for name in ("update_user", "delete_user"):
+            url = reverse(name, kwargs={"pk": other.id})
+
+            self.client.logout()
+            with self.assertMaxQueries(0):
+                self.client.get(url)
+                self.client.post(url)
+
+            # Only the session and the session user are read.
+            self.client.force_login(self.user)
+            with self.assertMaxQueries(2):
+                self.client.get(url)
+            with self.assertMaxQueries(2):
+                self.client.post(url)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class TestImportUsers(TestCase):
+    def import_users(self, content, workers=0):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as source:
+            source.write(content)
+            source.flush()
+            out = StringIO()
+            call_command(
+                "import_users",
+                source.name,
+                batch_size=2,
+                workers=workers,
+                stdout=out,
+                stderr=StringIO(),
+            )
+            return out.getvalue()
+
+    def test_import(self):
+        out = self.import_users(
+            "username,first_name,last_name,password\n"
+            "gl,Rob,Glo,Pukote74.\n"
+            "lovz,Uki,G,Pukote75.\n"
+            "wiku,Bob,WoW,Pukote76.\n",
+            workers=2,
+        )
+
+        self.assertIn("Created 3 users", out)
+        user = User.objects.get(username="lovz")
+        self.assertEqual(user.get_full_name(), "Uki G")
+        self.assertTrue(user.check_password("Pukote75."))
+
+    def test_invalid_rows_import_nothing(self):
+        User.objects.create(username="wiku")
+
+        with self.assertRaisesMessage(CommandError, "3 invalid rows"):
+            self.import_users(
+                "username,first_name,last_name,password\n"
+                "gl,Rob,Glo,Pukote74.\n"
+                "gl,Rob,Glo,Pukote74.\n"
+                "wiku,Bob,WoW,Pukote76.\n"
+                "lovz,Uki,G,1\n",
+            )
+
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_errors_report_file_lines(self):
+        rows = bulk.read_rows(
+            StringIO(
+                "username,first_name,last_name,password\n"
+                'gl,"Rob\nRobert",Glo,Pukote74.\n'
+                "gl,Rob,Glo,Pukote74.\n"
+            )
+        )
+
+        with self.assertRaises(bulk.BulkImportError) as cm:
+            bulk.provision_users(rows, batch_size=2, workers=0)
+
+        [error] = cm.exception.errors
+        self.assertEqual(error["line"], 4)
+        self.assertEqual(
+            error["errors"]["username"][0]["message"], bulk.DUPLICATE_USERNAME
+        )
+
+    def test_import_rejects_invalid_utf8(self):
+        with tempfile.NamedTemporaryFile("wb", suffix=".csv") as source:
+            source.write(b"username,first_name,last_name,password\n\xff\n")
+            source.flush()
+
+            with self.assertRaisesMessage(CommandError, "not valid UTF-8"):
+                call_command("import_users", source.name, workers=0)
@@ -1,9 +1,16 @@
+from django.conf import settings
 from django.urls import path
+from task_manager.decorators import cache_anonymous_page
 from .views import RegistrationView
 from .views import UpdateUserView, DeleteUserView, UsersView
+from .views import UsersExportView, AsyncUsersView, UsersApiView
+
+UsersView = AsyncUsersView if settings.ASYNC_VIEWS else UsersView
 
 urlpatterns = [
-    path("", UsersView.as_view(), name="users"),
+    path("", cache_anonymous_page(UsersView.as_view()), name="users"),
+    path("api/", UsersApiView.as_view(), name="api_users"),
+    path("export/", UsersExportView.as_view(), name="export_users"),
     path("create/", RegistrationView.as_view(), name="create_user"),
     path("<int:pk>/update/", UpdateUserView.as_view(), name="update_user"),
     path("<int:pk>/delete/", DeleteUserView.as_view(), name="delete_user"),
@@ -1,16 +1,57 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.conf import settings
+from django.db.models import ProtectedError, Q
+from django.http import StreamingHttpResponse
+from django.shortcuts import render, redirect
 from django.views import View
 from .forms import UserCreateForm
 from django.contrib.auth.models import User
 from django.contrib import messages
 from django.utils.translation import gettext as _
+from asgiref.sync import sync_to_async
+from task_manager.api import conditional_json
+from task_manager.conditional import make_etag, page_etag
+from task_manager.conditional import not_modified, set_validators
+from task_manager.task.models import Task
+from task_manager.pagination import KeysetPaginator, SearchPaginator
+from task_manager.pagination import get_next_query, stream_csv
+from task_manager.search import get_query, search
+from task_manager.utils import ais_authenticated, arender
+from task_manager.mixins import AuthRequiredMixin, OwnerRequiredMixin
 
 
 REGISTRATION_SUCCESS = _("User successfully registered")
-AUTHENTICATION_ERROR = _("You are not authorized! Please sign in.")
 USER_UPDATE_SUCCESS = _("User updated successfully")
 USER_DELETE_SUCCESS = _("User deleted successfully")
 USER_UPDATE_ERROR = _("You do not have rights to change another user.")
+USER_DELETE_ERROR = _("Cannot delete user because it is in use")
+
+USERS_LIST_FIELDS = (
+    "id",
+    "username",
+    "first_name",
+    "last_name",
+    "date_joined",
+)
+USER_SEARCH_FIELDS = ("username", "first_name", "last_name")
+
+
+def get_users():
+    return User.objects.exclude(is_staff=True).only(*USERS_LIST_FIELDS)
+
+
+def get_paginator(request):
+    query = get_query(request)
+    if query:
+        return SearchPaginator(search(get_users(), USER_SEARCH_FIELDS, query))
+
+    return KeysetPaginator(get_users(), "date_joined")
+
+
+def get_rows(users):
+    return [
+        {field: getattr(user, field) for field in USERS_LIST_FIELDS}
+        for user in users
+    ]
 
 
 class UsersView(View):
@@ -20,13 +61,110 @@ class UsersView(View):
         if request.user.is_authenticated:
             current_user = request.user
 
-        users = User.objects.all().exclude(is_staff=True)
+        paginator = get_paginator(request)
+        users, next_cursor = paginator.get_page(request)
+        page_size = paginator.get_page_size(request)
 
-        return render(
-            request,
-            "user/users.html",
-            {"users": users, "current_user": current_user},
+        # No Last-Modified: no column tells when a profile was edited.
+        etag = page_etag(request, get_rows(users), next_cursor, page_size)
+        response = not_modified(request, etag)
+
+        if response is None:
+            response = render(
+                request,
+                "user/users.html",
+                {
+                    "users": users,
+                    "current_user": current_user,
+                    "next_cursor": next_cursor,
+                    "next_query": get_next_query(
+                        request, paginator, next_cursor
+                    ),
+                    "page_size": page_size,
+                    "query": get_query(request),
+                },
+            )
+
+        # The page shows the current user's links: keep it out of
+        # shared caches.
+        return set_validators(response, etag, private=current_user is not None)
+
+
+class AsyncUsersView(View):
+    async def get(self, request):
+        current_user = None
+
+        if await ais_authenticated(request):
+            current_user = request.user
+
+        paginator = get_paginator(request)
+        users, next_cursor = await paginator.aget_page(request)
+        page_size = paginator.get_page_size(request)
+
+        etag = await sync_to_async(page_etag)(
+            request, get_rows(users), next_cursor, page_size
+        )
+        response = not_modified(request, etag)
+
+        if response is None:
+            response = await arender(
+                request,
+                "user/users.html",
+                {
+                    "users": users,
+                    "current_user": current_user,
+                    "next_cursor": next_cursor,
+                    "next_query": get_next_query(
+                        request, paginator, next_cursor
+                    ),
+                    "page_size": page_size,
+                    "query": get_query(request),
+                },
+            )
+
+        return set_validators(response, etag, private=current_user is not None)
+
+
+class UsersApiView(View):
+    """
+    The users list as JSON, paginated and searched (q) like the HTML
+    page. The ETag is computed from the rows of the page, which also
+    changes when a user edits their profile, so a revalidation costs the
+    page query but nothing is serialized.
+    """
+
+    def get(self, request):
+        paginator = get_paginator(request)
+        users, next_cursor = paginator.get_page(request)
+        rows = get_rows(users)
+        etag = make_etag(rows, next_cursor)
+
+        def get_data():
+            next_query = get_next_query(request, paginator, next_cursor)
+            next_url = next_query and f"{request.path}?{next_query}"
+            return {"results": rows, "next": next_url}
+
+        return conditional_json(request, etag, get_data)
+
+
+class UsersExportView(AuthRequiredMixin, View):
+    def get(self, request):
+        users = (
+            get_users()
+            .order_by("date_joined", "id")
+            .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+        )
+        rows = (
+            (user.id, user.username, user.get_full_name(), user.date_joined)
+            for user in users
+        )
+        header = ("id", "username", "full_name", "date_joined")
+
+        response = StreamingHttpResponse(
+            stream_csv(header, rows), content_type="text/csv"
         )
+        response["Content-Disposition"] = 'attachment; filename="users.csv"'
+        return response
 
 
 class RegistrationView(View):
@@ -48,105 +186,71 @@ class RegistrationView(View):
         return render(request, "user/create_user.html", {"form": form})
 
 
-class UpdateUserView(View):
-    def get(self, request, **kwargs):
-        pk = kwargs.get("pk")
-        user = get_object_or_404(User, id=pk)
+class UpdateUserView(OwnerRequiredMixin, View):
+    owner_error = USER_UPDATE_ERROR
+    owner_error_url = "users"
 
-        if request.user.is_authenticated:
-            if request.user.id != user.id:
-                messages.add_message(
-                    request, messages.ERROR, USER_UPDATE_ERROR
-                )
-
-                return redirect("users")
-
-            form = UserCreateForm(
-                initial={
-                    "username": user.username,
-                    "first_name": user.first_name,
-                    "last_name": user.last_name,
-                }
-            )
-
-            return render(
-                request,
-                "user/update_user.html",
-                {"form": form, "user": user, "username": user.username},
-            )
+    def get(self, request, **kwargs):
+        user = request.user
+        form = UserCreateForm(
+            initial={
+                "username": user.username,
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+            }
+        )
 
-        messages.add_message(request, messages.ERROR, AUTHENTICATION_ERROR)
-        return redirect("login")
+        return render(
+            request,
+            "user/update_user.html",
+            {"form": form, "user": user, "username": user.username},
+        )
 
     def post(self, request, **kwargs):
-        pk = kwargs.get("pk")
-        user = get_object_or_404(User, id=pk)
+        user = request.user
         username = user.username
+        form = UserCreateForm(request.POST, instance=user)
 
-        if request.user.is_authenticated:
-            if request.user.id != user.id:
-                messages.add_message(
-                    request, messages.ERROR, USER_UPDATE_ERROR
-                )
-
-                return redirect("users")
-
-            form = UserCreateForm(request.POST, instance=user)
-
-            if form.is_valid():
-                form.save()
-                messages.add_message(
-                    request, messages.SUCCESS, USER_UPDATE_SUCCESS
-                )
-
-                return redirect("users")
-
-            return render(
-                request,
-                "user/update_user.html",
-                {"form": form, "user": user, "username": username},
+        if form.is_valid():
+            form.save()
+            messages.add_message(
+                request, messages.SUCCESS, USER_UPDATE_SUCCESS
             )
 
-        messages.add_message(request, messages.ERROR, AUTHENTICATION_ERROR)
-        return redirect("login")
-
-
-class DeleteUserView(View):
-    def get(self, request, **kwargs):
-        pk = kwargs.get("pk")
-        user = get_object_or_404(User, id=pk)
+            return redirect("users")
 
-        if request.user.is_authenticated:
-            if request.user.id != user.id:
-                messages.add_message(
-                    request, messages.ERROR, USER_UPDATE_ERROR
-                )
+        return render(
+            request,
+            "user/update_user.html",
+            {"form": form, "user": user, "username": username},
+        )
 
-                return redirect("users")
 
-            return render(request, "user/delete_user.html", {"user": user})
+class DeleteUserView(OwnerRequiredMixin, View):
+    owner_error = USER_UPDATE_ERROR
+    owner_error_url = "users"
 
-        messages.add_message(request, messages.ERROR, AUTHENTICATION_ERROR)
-        return redirect("login")
+    def get(self, request, **kwargs):
+        return render(request, "user/delete_user.html", {"user": request.user})
 
     def post(self, request, **kwargs):
-        pk = kwargs.get("pk")
-        user = get_object_or_404(User, id=pk)
-
-        if request.user.is_authenticated:
-            if request.user.id != user.id:
-                messages.add_message(
-                    request, messages.ERROR, USER_UPDATE_ERROR
-                )
-
-                return redirect("users")
-
-            user.delete()
-            messages.add_message(
-                request, messages.SUCCESS, USER_DELETE_SUCCESS
-            )
-
+        user = request.user
+        # One EXISTS query; the PROTECT check of delete() would load the
+        # ids of all the user's tasks to refuse.
+        in_use = Task.objects.filter(
+            Q(author_id=user.id) | Q(executor_id=user.id)
+        ).exists()
+        if not in_use:
+            try:
+                user.delete()
+            except ProtectedError:
+                # A task took the user after the check.
+                in_use = True
+
+        if in_use:
+            messages.add_message(request, messages.ERROR, USER_DELETE_ERROR)
             return redirect("users")
 
-        messages.add_message(request, messages.ERROR, AUTHENTICATION_ERROR)
-        return redirect("login")
+        messages.add_message(request, messages.SUCCESS, USER_DELETE_SUCCESS)
+
+        return redirect("users")
@@ -0,0 +1,22 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import render
+
+
+@sync_to_async
+def ais_authenticated(request):
+    # Resolving request.user reads the session and the user row,
+    # which is sync-only in Django 4.1.
+    return request.user.is_authenticated
+
+
+# Context processors (auth, messages) may still touch the session,
+# so templates are rendered in the sync thread.
+arender = sync_to_async(render)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
@@ -1,9 +1,11 @@
 from django.shortcuts import render, redirect
 from django.views import View
-from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth import login, logout
 from django.contrib import messages
 from django.utils.translation import gettext as _
 from django.contrib.auth.forms import AuthenticationForm
+from . import throttle
+from .utils import arender
 
 
 LOGIN_SUCCESS = _("You are logged in")
@@ -12,6 +14,7 @@ LOGIN_ERROR = _(
     "Please enter the correct username and password. "
     "Both fields can be case sensitive."
 )
+LOGIN_THROTTLED = _("Too many login attempts. Please try again later.")
 
 
 class MainView(View):
@@ -19,26 +22,35 @@ class MainView(View):
         return render(request, "main.html")
 
 
+class AsyncMainView(View):
+    async def get(self, request):
+        return await arender(request, "main.html")
+
+
 class LoginView(View):
     def get(self, request):
         form = AuthenticationForm()
         return render(request, "login.html", {"form": form})
 
     def post(self, request):
+        username = request.POST.get("username")
+
+        if throttle.is_throttled(request, username):
+            form = AuthenticationForm(initial={"username": username})
+            messages.add_message(request, messages.ERROR, LOGIN_THROTTLED)
+            return render(request, "login.html", {"form": form}, status=429)
+
         form = AuthenticationForm(request, data=request.POST)
 
+        # is_valid() already authenticates the user (and checks is_active),
+        # so the password is hashed only once per attempt.
         if form.is_valid():
-            user_data = form.cleaned_data
-            user = authenticate(
-                username=user_data.get("username"),
-                password=user_data.get("password"),
-            )
-
-            if user and user.is_active:
-                login(request, user)
-                messages.add_message(request, messages.SUCCESS, LOGIN_SUCCESS)
-                return redirect("main")
+            login(request, form.get_user())
+            throttle.reset(request, username)
+            messages.add_message(request, messages.SUCCESS, LOGIN_SUCCESS)
+            return redirect("main")
 
+        throttle.register_failure(request, username)
         messages.add_message(request, messages.ERROR, LOGIN_ERROR)
         return render(request, "login.html", {"form": form})
 
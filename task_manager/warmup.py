@@ -0,0 +1,103 @@
+"""
+Work a worker would otherwise do on its first requests: compiling the
+templates into the cached loader, importing and indexing the URLconf and
+importing the modules Django and django-bootstrap4 load on first use.
+
+wsgi.py and asgi.py run it once the app is loaded. Under gunicorn with
+preload_app it runs in the master, so the workers are forked with all of
+it done and share those pages; otherwise each worker runs it at boot,
+before accepting connections.
+
+Only the project's templates are compiled (those under BASE_DIR), not
+the admin's or other packages'.
+"""
+from pathlib import Path
+from time import perf_counter
+
+from bootstrap4.bootstrap import get_field_renderer, get_form_renderer
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.urls import get_resolver
+from django.utils.module_loading import import_string
+
+
+def get_template_dirs(engine):
+    base_dir = Path(settings.BASE_DIR).resolve()
+    dirs = list(engine.dirs)
+
+    for loader in engine.template_loaders:
+        if hasattr(loader, "get_dirs"):
+            dirs.extend(loader.get_dirs())
+
+    for directory in dict.fromkeys(Path(d).resolve() for d in dirs):
+        if directory.is_dir() and directory.is_relative_to(base_dir):
+            yield directory
+
+
+def get_template_names(engine):
+    names = set()
+
+    for directory in get_template_dirs(engine):
+        for path in directory.rglob("*.html"):
+            names.add(path.relative_to(directory).as_posix())
+
+    return sorted(names)
+
+
+def get_engines():
+    for backend in engines.all():
+        if isinstance(backend, DjangoTemplates):
+            yield backend.engine
+
+
+def reset_templates():
+    """Empties the cached loaders."""
+    for engine in get_engines():
+        for loader in engine.template_loaders:
+            if hasattr(loader, "reset"):
+                loader.reset()
+
+
+def compile_templates():
+    """
+    Loads every project template through its engine, which keeps the
+    compiled template when the cached loader is on. Returns the compile
+    time of each one in ms, and the errors of those that don't compile.
+    """
+    timings = {}
+    errors = {}
+
+    for engine in get_engines():
+        for name in get_template_names(engine):
+            start = perf_counter()
+            try:
+                engine.get_template(name)
+            except TemplateSyntaxError as exc:
+                errors[name] = exc
+                continue
+            timings[name] = (perf_counter() - start) * 1000
+
+    return timings, errors
+
+
+def resolve_urls():
+    """Imports the views and builds the reverse() lookup tables."""
+    return get_resolver().reverse_dict
+
+
+def import_modules():
+    for engine in get_engines():
+        engine.template_context_processors
+    import_string(settings.MESSAGE_STORAGE)
+    import_string(settings.SESSION_SERIALIZER)
+    # The form renderer pulls in BeautifulSoup and html5lib.
+    get_form_renderer()
+    get_field_renderer()
+
+
+def run():
+    if settings.WARMUP:
+        compile_templates()
+        resolve_urls()
+        import_modules()